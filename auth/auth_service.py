@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from services.supabase_service import supabase_service
+from services.async_supabase_service import run_sync
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +20,8 @@ async def verify_supabase_token(credentials = Depends(security)) -> dict:
     token = credentials.credentials
 
     try:
-        user = supabase_service.client.auth.get_user(token)
+        # 동기 HTTP 호출 → 전용 스레드 풀 (요청마다 이벤트 루프 블로킹 방지)
+        user = await run_sync(supabase_service.client.auth.get_user, token)
 
         if not user or not user.user:
             logger.error("Invalid token: user not found")
@@ -2,6 +2,7 @@
 import logging
 from datetime import datetime
 from services.supabase_service import supabase_service
+from services.async_supabase_service import run_sync
 from typing import Optional, Dict
 
 logger = logging.getLogger(__name__)
@@ -33,7 +34,25 @@ class UserService:
 
         Returns:
             users 테이블의 id (UUID) - 이걸 user_fk로 사용
+
+        ※ 동기 Supabase 호출은 워커 스레드에서 실행 (History 로드 등과 동시 진행 가능)
         """
+        return await run_sync(
+            UserService._get_or_create_user_sync,
+            user_id, email, name, department, auth_type, teams_tenant_id, metadata
+        )
+
+    @staticmethod
+    def _get_or_create_user_sync(
+            user_id: str,
+            email: Optional[str],
+            name: Optional[str],
+            department: Optional[str],
+            auth_type: str,
+            teams_tenant_id: Optional[str],
+            metadata: Optional[Dict]
+    ) -> str:
+        """get_or_create_user 동기 구현 (users 조회 → 업데이트 또는 생성)"""
         try:
             # 1️⃣ 기존 사용자 조회
             response = supabase_service.client.table("users").select("id").eq(
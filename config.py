@@ -17,6 +17,14 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# Postgres 직접 연결 (핫 패스 읽기용, 미설정 시 REST 사용)
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL")
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "10"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "50"))
+
+# 동기 Supabase(REST) 호출 전용 스레드 풀 크기 (동시 HTTP 호출 상한)
+SUPABASE_EXECUTOR_MAX_WORKERS = int(os.getenv("SUPABASE_EXECUTOR_MAX_WORKERS", "20"))
+
 # ==========================================
 # OpenAI
 # ==========================================
@@ -31,6 +39,13 @@ TOKENIZERS_PARALLELISM = os.getenv("TOKENIZERS_PARALLELISM", "false")
 
 EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
 
+# 디스크 임베딩 캐시 (재색인 시 변경 없는 청크 재임베딩 방지)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/emb.sqlite")
+
+# 쿼리 임베딩 메모리 LRU (1024차원 float32 ≈ 4KB/개 → 10000개 ≈ 40MB)
+EMBEDDING_QUERY_CACHE_SIZE = int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", "10000"))
+
 # ==========================================
 # Server
 # ==========================================
@@ -102,7 +117,9 @@ def get_vector_search_config():
         'chunk_tokens': int(os.getenv("VECTOR_CHUNK_TOKENS", "400")),
         'overlap_tokens': int(os.getenv("VECTOR_OVERLAP_TOKENS", "50")),
         'min_chunk_tokens': int(os.getenv("VECTOR_MIN_CHUNK_TOKENS", "30")),
-        'similarity_threshold': float(os.getenv("VECTOR_SIMILARITY_THRESHOLD", "0.5"))
+        'similarity_threshold': float(os.getenv("VECTOR_SIMILARITY_THRESHOLD", "0.5")),
+        # halfvec(fp16) 컬럼 검색 (db/sql/halfvec_migration.sql 적용 후 활성화)
+        'use_halfvec': os.getenv("VECTOR_USE_HALFVEC", "false").lower() == "true"
     }
 
     print(f"📊 VECTOR_SEARCH_CONFIG 로드 | ENV={ENV} | ef_search={base_config['ef_search']}")
@@ -119,3 +136,13 @@ RERANKER_CONFIG = {
     'enabled': True,  # 리랭킹 활성화 여부
     'top_k': 8  # 최종 반환 개수
 }
+
+# ==========================================
+# 시맨틱 응답 캐시 설정
+# ==========================================
+SEMANTIC_CACHE_CONFIG = {
+    'enabled': os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true",
+    'threshold': float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97")),  # 코사인 유사도
+    'max_entries': int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000")),
+    'ttl_seconds': int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+}
@@ -0,0 +1,128 @@
+# db/pool.py
+"""
+🗄️ Postgres 직접 연결 풀 (asyncpg)
+
+역할:
+- 핫 패스 읽기 쿼리를 PostgREST(HTTPS + JSON) 대신 Postgres 직접 연결로 처리
+- 워커 프로세스당 하나의 풀 공유 (싱글톤)
+
+책임: 풀 생성/종료/상태 조회만 담당 (쿼리는 supabase_service가 담당)
+
+※ SUPABASE_DB_URL 미설정 또는 asyncpg 미설치 시 None 반환 → 호출부는 REST 경로로 폴백
+"""
+
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from config import SUPABASE_DB_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE
+
+try:
+    import asyncpg
+except ImportError:  # 선택 의존성
+    asyncpg = None
+
+try:
+    from pgvector.asyncpg import register_vector
+except ImportError:
+    register_vector = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # str 입력 그대로 처리, 표준 json 대비 수 배 빠름
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = asyncio.Lock()
+_pool_failed = False
+
+
+async def _init_connection(conn) -> None:
+    """
+    커넥션별 초기화
+    - json/jsonb를 dict로 디코딩 (PostgREST 응답과 동일한 형태, orjson 우선)
+    - pgvector 바이너리 코덱 등록 (COPY로 embedding 저장 시 필요)
+    """
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=_json_loads,
+            schema="pg_catalog"
+        )
+
+    if register_vector is not None:
+        try:
+            # Supabase는 vector 확장이 extensions 스키마에 설치되는 경우가 있음
+            schema = await conn.fetchval(
+                "SELECT typnamespace::regnamespace::text FROM pg_type WHERE typname = 'vector' LIMIT 1"
+            )
+            if schema:
+                await register_vector(conn, schema=schema)
+        except Exception as e:
+            logger.debug(f"⚠️ pgvector 코덱 등록 실패 (텍스트 폴백 사용): {e}")
+
+
+async def get_pool():
+    """
+    asyncpg 풀 반환 (최초 호출 시 생성)
+
+    반환:
+    asyncpg.Pool 또는 None (미설정/생성 실패 시)
+    """
+    global _pool, _pool_failed
+
+    if _pool is not None:
+        return _pool
+    if asyncpg is None or not SUPABASE_DB_URL or _pool_failed:
+        return None
+
+    async with _pool_lock:
+        if _pool is None and not _pool_failed:
+            try:
+                _pool = await asyncpg.create_pool(
+                    dsn=SUPABASE_DB_URL,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    max_inactive_connection_lifetime=300,
+                    # ✅ Supavisor(트랜잭션 모드) 호환: prepared statement 캐시 비활성화
+                    statement_cache_size=0,
+                    init=_init_connection
+                )
+                logger.info(f"✅ Postgres 풀 생성 (min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE})")
+            except Exception as e:
+                # 한 번 실패하면 REST 경로로 계속 폴백 (요청마다 재시도하지 않음)
+                _pool_failed = True
+                logger.error(f"❌ Postgres 풀 생성 실패 (REST 폴백): {e}")
+
+    return _pool
+
+
+async def close_pool() -> None:
+    """풀 종료 (앱 종료 시)"""
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("✅ Postgres 풀 종료")
+
+
+def get_stats() -> dict:
+    """헬스체크용 풀 상태"""
+    if _pool is None:
+        return {
+            "status": "disabled" if not SUPABASE_DB_URL or asyncpg is None else "not_initialized"
+        }
+
+    return {
+        "status": "up",
+        "size": _pool.get_size(),
+        "idle": _pool.get_idle_size(),
+        "min_size": _pool.get_min_size(),
+        "max_size": _pool.get_max_size(),
+    }
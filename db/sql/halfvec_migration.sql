@@ -0,0 +1,62 @@
+-- db/sql/halfvec_migration.sql
+-- 임베딩 halfvec(fp16) 검색 컬럼 추가 (pgvector 0.7+)
+--
+-- ✅ 인덱스/스캔 대상 벡터 크기 절반 (1024차원: 4KB → 2KB) → 메모리/IO 절감
+-- ✅ 원본 embedding(float32) 컬럼은 유지 (롤아웃 검증 후 제거 검토)
+-- ✅ 생성 컬럼 → 기존 저장 경로(add_chunk / add_chunks_batch / COPY) 수정 불필요
+--
+-- 적용 순서:
+-- 1. 이 파일 실행 (Supabase SQL Editor)
+-- 2. VECTOR_USE_HALFVEC=true 설정 후 재배포 → search_chunks가 match_documents_halfvec 사용
+-- 3. 검색 품질 확인 후 (선택) 기존 embedding HNSW 인덱스 제거
+
+-- 1️⃣ halfvec 생성 컬럼 (기존 행 자동 백필)
+ALTER TABLE document_chunks
+    ADD COLUMN IF NOT EXISTS embedding_h halfvec(1024)
+    GENERATED ALWAYS AS (embedding::halfvec(1024)) STORED;
+
+-- 2️⃣ halfvec 코사인 HNSW 인덱스
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_h_hnsw_idx
+    ON document_chunks USING hnsw (embedding_h halfvec_cosine_ops);
+
+-- 3️⃣ halfvec 검색 RPC (match_documents와 동일한 시그니처/반환 형식)
+CREATE OR REPLACE FUNCTION match_documents_halfvec(
+    query_embedding vector(1024),
+    match_count int DEFAULT 5,
+    match_threshold float DEFAULT 0.0,
+    ef_search_value int DEFAULT 40,
+    source_filter text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    similarity float,
+    title text,
+    source text,
+    metadata jsonb
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    query_h halfvec(1024) := query_embedding::halfvec(1024);
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search_value::text, true);
+
+    RETURN QUERY
+    SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        1 - (dc.embedding_h <=> query_h) AS similarity,
+        d.title,
+        d.source,
+        d.metadata
+    FROM document_chunks dc
+    JOIN documents d ON d.id = dc.document_id
+    WHERE (source_filter IS NULL OR d.source = ANY(source_filter))
+      AND 1 - (dc.embedding_h <=> query_h) >= match_threshold
+    ORDER BY dc.embedding_h <=> query_h
+    LIMIT match_count;
+END;
+$$;
@@ -0,0 +1,61 @@
+-- db/sql/inner_product_index.sql
+-- 코사인 → 내적(inner product) 검색 전환 (선택)
+--
+-- ✅ embedding_service가 L2 정규화된 단위 벡터를 저장하므로 코사인 유사도 = 내적
+-- ✅ vector_ip_ops는 비교마다 노름 계산 생략 → 거리 계산 비용 감소
+--
+-- ⚠️ 기존 행이 모두 단위 벡터인지 먼저 확인 (0이 아니면 재색인 후 적용)
+
+-- 0️⃣ 확인: 노름이 1에서 벗어난 행 수
+SELECT count(*) AS non_unit_rows
+FROM document_chunks
+WHERE abs(vector_norm(embedding) - 1.0) > 1e-3;
+
+-- 1️⃣ 내적 HNSW 인덱스
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_ip_hnsw_idx
+    ON document_chunks USING hnsw (embedding vector_ip_ops);
+
+-- 2️⃣ match_documents: 거리 연산자 교체 (<=> → <#>, <#>는 음의 내적 반환)
+DROP FUNCTION IF EXISTS match_documents(vector, int, float, int, text[]);
+
+CREATE OR REPLACE FUNCTION match_documents(
+    query_embedding vector(1024),
+    match_count int DEFAULT 5,
+    match_threshold float DEFAULT 0.0,
+    ef_search_value int DEFAULT 40,
+    source_filter text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    similarity float,
+    title text,
+    source text,
+    metadata jsonb
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM set_config('hnsw.ef_search', ef_search_value::text, true);
+
+    RETURN QUERY
+    SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        -(dc.embedding <#> query_embedding) AS similarity,
+        d.title,
+        d.source,
+        d.metadata
+    FROM document_chunks dc
+    JOIN documents d ON d.id = dc.document_id
+    WHERE (source_filter IS NULL OR d.source = ANY(source_filter))
+      AND -(dc.embedding <#> query_embedding) >= match_threshold
+    ORDER BY dc.embedding <#> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- 3️⃣ (검증 후) 기존 코사인 인덱스 제거
+-- DROP INDEX IF EXISTS document_chunks_embedding_hnsw_idx;
@@ -0,0 +1,57 @@
+-- db/sql/match_documents.sql
+-- 벡터 유사도 검색 RPC (SupabaseService.search_chunks)
+--
+-- ✅ 서버 측에서 유사도 임계값 + 출처 필터 + top-k 정렬까지 처리 (왕복 1회)
+-- ✅ source_filter 기본값 NULL → 기존 호출(파라미터 미전달)과 호환
+--
+-- 적용: Supabase SQL Editor에서 실행
+
+-- 기존 시그니처 제거 (파라미터 추가 시 오버로드 충돌 방지)
+DROP FUNCTION IF EXISTS match_documents(vector, int, float, int);
+
+CREATE OR REPLACE FUNCTION match_documents(
+    query_embedding vector(1024),
+    match_count int DEFAULT 5,
+    match_threshold float DEFAULT 0.0,
+    ef_search_value int DEFAULT 40,
+    source_filter text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    document_id uuid,
+    content text,
+    similarity float,
+    title text,
+    source text,
+    metadata jsonb
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- HNSW 탐색 폭 (트랜잭션 범위)
+    PERFORM set_config('hnsw.ef_search', ef_search_value::text, true);
+
+    RETURN QUERY
+    SELECT
+        dc.id,
+        dc.document_id,
+        dc.content,
+        1 - (dc.embedding <=> query_embedding) AS similarity,
+        d.title,
+        d.source,
+        d.metadata
+    FROM document_chunks dc
+    JOIN documents d ON d.id = dc.document_id
+    WHERE (source_filter IS NULL OR d.source = ANY(source_filter))
+      AND 1 - (dc.embedding <=> query_embedding) >= match_threshold
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- 코사인 거리 HNSW 인덱스 (ef_search_value와 함께 사용)
+CREATE INDEX IF NOT EXISTS document_chunks_embedding_hnsw_idx
+    ON document_chunks USING hnsw (embedding vector_cosine_ops);
+
+-- 출처 필터용
+CREATE INDEX IF NOT EXISTS documents_source_idx ON documents (source);
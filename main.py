@@ -36,7 +36,10 @@ from contextlib import asynccontextmanager
 from services.embedding_service import embedding_service
 from services.supabase_service import supabase_service
 from services.langchain_rag_service import langchain_rag_service
+from services.history_service import history_service
 from routers import chat_router, teams_router, container_router, admin_router
+from db import pool as db_pool
+from services.async_supabase_service import shutdown_executor as shutdown_supabase_executor
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +68,12 @@ async def lifespan(app: FastAPI):
         print(f"❌ Supabase 연결 오류: {e}")
         logger.error(f"Supabase 연결 오류: {e}", exc_info=True)
 
+    # ✅ Postgres 직접 연결 풀 (SUPABASE_DB_URL 설정 시)
+    if await db_pool.get_pool() is not None:
+        print("✅ Postgres 연결 풀 준비 완료!")
+    else:
+        print("ℹ️  Postgres 연결 풀 미사용 - REST 경로로 조회")
+
     # ✅ 임베딩 모델 워밍업 (선택)
     if ENV == "production":
         print("🤖 임베딩 모델 워밍업 중...")
@@ -116,6 +125,17 @@ async def lifespan(app: FastAPI):
     logger.info("VEDDY 서버 종료 시작")
 
     try:
+        # 백그라운드 메시지 저장 완료 대기 (응답 후 저장 유실 방지)
+        await history_service.drain_pending_saves()
+
+        await db_pool.close_pool()
+        shutdown_supabase_executor()
+
+        # Teams 공유 HTTP 클라이언트 종료 (설정된 경우에만 로드됨)
+        teams_module = sys.modules.get("services.teams_service")
+        if teams_module is not None:
+            await teams_module.teams_service.aclose()
+
         print("✅ 리소스 정리 완료")
         logger.info("리소스 정리 완료")
     except Exception as e:
@@ -186,6 +206,9 @@ async def health_check():
         }
         health_status["status"] = "degraded"
 
+    # ✅ 1-1. Postgres 연결 풀 상태
+    health_status["checks"]["db_pool"] = db_pool.get_stats()
+
     # ✅ 2. 임베딩 모델 체크
     try:
         from services.embedding_service import embedding_service
@@ -292,7 +315,7 @@ async def test_supabase():
     try:
         is_connected = supabase_service.test_connection()
         if is_connected:
-            documents = supabase_service.list_documents(limit=1)
+            documents = await supabase_service.list_documents(limit=1)
             logger.info(
                 "Supabase 테스트 성공",
                 extra={"documents_count": len(documents)},
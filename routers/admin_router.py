@@ -10,6 +10,7 @@ import time
 
 from services.confluence_service import ConfluenceService
 from services.supabase_service import supabase_service
+from services.async_supabase_service import async_supabase_service
 from services.embedding_service import embedding_service
 from services.token_chunk_service import token_chunk_service
 from auth.auth_service import verify_supabase_token
@@ -127,7 +128,7 @@ async def load_confluence_data_stream(
                     await asyncio.sleep(0)
 
                     # 기존 문서 확인
-                    existing_doc = supabase_service.get_document_by_source_id(
+                    existing_doc = await async_supabase_service.get_document_by_source_id(
                         source="confluence",
                         source_id=page_id
                     )
@@ -147,7 +148,7 @@ async def load_confluence_data_stream(
                         continue
 
                     # 문서 저장
-                    saved_doc = supabase_service.add_document(
+                    saved_doc = await async_supabase_service.add_document(
                         source="confluence",
                         source_id=page_id,
                         title=page_title,
@@ -173,7 +174,7 @@ async def load_confluence_data_stream(
 
                     # 기존 청크 삭제
                     if existing_doc:
-                        supabase_service.delete_chunks_by_document_id(document_id)
+                        await async_supabase_service.delete_chunks_by_document_id(document_id)
 
                     # 청크 분할
                     chunks = token_chunk_service.chunk_text(
@@ -191,17 +192,14 @@ async def load_confluence_data_stream(
                     # 벡터 임베딩
                     embeddings = embedding_service.embed_batch(chunks)
 
-                    # ✅ 배치 저장
-                    chunks_batch = []
-                    for chunk_num, (chunk_content, embedding) in enumerate(zip(chunks, embeddings), 1):
-                        chunks_batch.append({
-                            "document_id": document_id,
-                            "chunk_number": chunk_num,
-                            "content": chunk_content,
-                            "embedding": embedding
-                        })
-
-                    saved_count = supabase_service.add_chunks_batch(chunks_batch)
+                    # ✅ 일괄 저장 (COPY 1회)
+                    chunk_items = [
+                        (chunk_num, chunk_content, embedding)
+                        for chunk_num, (chunk_content, embedding) in enumerate(zip(chunks, embeddings), 1)
+                    ]
+
+                    # ❌ 저장 실패 시 예외 → 아래 except에서 page_error로 보고 (청크 0개로 완료 처리 안 함)
+                    saved_count = await supabase_service.add_chunks_bulk(document_id, chunk_items)
                     total_chunks += saved_count
 
                     # ✅ 페이지 완료 알림 (즉시)
@@ -259,7 +257,7 @@ async def get_confluence_status(
     logger = get_logger(__name__, user_id=user["user_id"])
 
     try:
-        all_docs = supabase_service.list_documents(limit=1000)
+        all_docs = await supabase_service.list_documents(limit=1000)
         confluence_docs = [d for d in all_docs if d.get("source") == "confluence"]
 
         space_stats = {}
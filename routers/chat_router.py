@@ -9,11 +9,10 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 from typing import AsyncGenerator
 from model.schemas import ChatRequest
-from services.unified_chat_service import unified_chat_service
+from services.unified_chat_service import unified_chat_service, sse_frame, is_sse_frame
 from services.supabase_service import SupabaseService
 from auth.auth_service import verify_supabase_token
 from logging_config import get_logger, generate_request_id
-import json
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -36,7 +35,8 @@ async def chat_stream(
     request_id = generate_request_id()
     logger = get_logger(__name__, request_id=request_id, user_id=user["user_id"])
 
-    user_supabase = SupabaseService(access_token=user["access_token"])
+    # ✅ 같은 토큰이면 기존 클라이언트(연결 포함) 재사용
+    user_supabase = SupabaseService.for_user(user["access_token"])
 
     logger.info("📨 Web 채팅 요청 수신", extra={
         "query": request_body.query[:50],
@@ -57,18 +57,17 @@ async def chat_stream(
                     name=user.get("name")
             ):
                 # 🔥 토큰을 JSON으로 감싸서 전송
-                if token.startswith(" {"):
-                    # 이미 JSON 형식 (error, done 메시지)
+                if is_sse_frame(token):
+                    # 이미 SSE 프레임 (error, done 메시지)
                     yield token
                 else:
                     # 일반 텍스트 토큰 → JSON으로 감싸기
-                    data = json.dumps({"type": "token", "token": token}, ensure_ascii=False)
-                    yield f" {data}\n\n"
+                    yield sse_frame({"type": "token", "token": token})
 
         except Exception as e:
             logger.error(f"❌ 채팅 처리 오류: {e}", exc_info=True)
             error_msg = "처리 중 오류가 발생했습니다"
-            yield f" {json.dumps({'type': 'error', 'error': error_msg}, ensure_ascii=False)}\n\n"
+            yield sse_frame({'type': 'error', 'error': error_msg})
 
     return StreamingResponse(
         generate(),
@@ -9,11 +9,12 @@
 
 import asyncio
 import logging
+import re
 from fastapi import APIRouter, Request, HTTPException
 from botbuilder.schema import Activity, ActivityTypes
-from services.unified_chat_service import unified_chat_service
+from services.unified_chat_service import unified_chat_service, is_sse_frame
 from services.supabase_service import supabase_service
-from services.teams_service import teams_service
+from services.teams_service import teams_service, TeamsStreamBuffer
 from services.microsoft_graph_service import microsoft_graph_service
 from logging_config import get_logger, generate_request_id
 
@@ -22,6 +23,11 @@ router = APIRouter(prefix="/api", tags=["teams"])
 
 logger = logging.getLogger(__name__)
 
+# Teams 스트리밍 업데이트 간격 (Teams 제한: 초당 1회)
+BUFFER_INTERVAL = 1.5
+
+DONE_SIGNAL_RE = re.compile(r'\{["\']type["\']\s*:\s*["\']done["\']\}')
+
 
 @router.post("/messages")
 async def handle_teams_message(request: Request):
@@ -111,94 +117,59 @@ async def handle_teams_message(request: Request):
         sequence += 1
         await asyncio.sleep(0.5)
 
-        # 【3️⃣】Response Streaming 준비
+        # 【3️⃣】Response Streaming (버퍼링: 주기적 일괄 전송)
         logger.info("✍️ Response Streaming 시작")
 
-        full_response = ""
-        token_buffer = ""
-        last_update_time = asyncio.get_event_loop().time()
-        BUFFER_INTERVAL = 1.5  # 1.5초마다 업데이트 (Teams 권장사항)
-
-        async for token in unified_chat_service.process_chat(
-                user_id=user_id,
-                query=user_message,
-                table_mode=table_mode,
-                client_type="teams",
-                supabase_client=supabase_service,
-                email=user_email,
-                name=user_name
-        ):
-            # ✅ 【추가】 done 시그널 필터링
-            if token and isinstance(token, str):
-                # JSON 형태의 done 시그널 무시
-                if '{"type":' in token or '"type": "done"' in token:
-                    continue
-
-                # 정규식으로 더 확실하게 필터링 (선택)
-                import re
-                if re.search(r'\{["\']type["\']\s*:\s*["\']done["\']\}', token):
-                    continue
-
-            # 토큰 누적
-            token_buffer += token
-            full_response += token
-
-            # 1.5초마다 한 번씩 업데이트 (버퍼링)
-            current_time = asyncio.get_event_loop().time()
-            if current_time - last_update_time >= BUFFER_INTERVAL:
-                logger.info(f"📤 Response 업데이트: {len(full_response)} 글자")
-
-                await teams_service.stream_message_response(
-                    conversation_id=conversation_id,
-                    service_url=service_url,
-                    stream_id=stream_id,
-                    message=full_response,  # 누적된 전체 응답
-                    sequence=sequence
-                )
-                sequence += 1
-                token_buffer = ""
-                last_update_time = current_time
-                await asyncio.sleep(0.1)  # 과부하 방지
-
-        # 버퍼에 남은 토큰이 있으면 마지막 업데이트
-        if token_buffer:
-            logger.info(f"📤 최종 Response 업데이트: {len(full_response)} 글자")
-
-            await teams_service.stream_message_response(
-                conversation_id=conversation_id,
-                service_url=service_url,
-                stream_id=stream_id,
-                message=full_response,
-                sequence=sequence
-            )
-            sequence += 1
-
-        # 【4️⃣】최종 응답 (스트리밍 종료)
-        logger.info("✅ 최종 응답 전송")
-
-        await teams_service.stream_message_final(
+        stream_buffer = TeamsStreamBuffer(
+            teams_service,
             conversation_id=conversation_id,
             service_url=service_url,
             stream_id=stream_id,
-            message=full_response
+            start_sequence=sequence,
+            min_interval=BUFFER_INTERVAL
         )
+        stream_buffer.start()
+
+        try:
+            async for token in unified_chat_service.process_chat(
+                    user_id=user_id,
+                    query=user_message,
+                    table_mode=table_mode,
+                    client_type="teams",
+                    supabase_client=supabase_service,
+                    email=user_email,
+                    name=user_name
+            ):
+                # ✅ 【추가】 done 시그널 필터링
+                if token and isinstance(token, str):
+                    # SSE 프레임(done/error)은 Teams 메시지에 포함하지 않음
+                    if is_sse_frame(token):
+                        continue
+
+                    # JSON 형태의 done 시그널 무시
+                    if '{"type":' in token or '"type": "done"' in token:
+                        continue
+
+                    # 정규식으로 더 확실하게 필터링 (선택)
+                    if DONE_SIGNAL_RE.search(token):
+                        continue
+
+                # 토큰 누적 (전송은 버퍼 태스크가 담당)
+                stream_buffer.append(token)
+
+        finally:
+            # 【4️⃣】최종 응답 (스트리밍 종료)
+            logger.info("✅ 최종 응답 전송")
+            full_response = await stream_buffer.finalize()
+
+        sequence = stream_buffer.sequence
 
         logger.info("✨ 스트리밍 완료", extra={
             "total_length": len(full_response),
             "sequence_count": sequence
         })
 
-        # 💾 메시지 저장 (비동기 백그라운드)
-        try:
-            await supabase_service.client.table("messages").insert({
-                "user_id": user_id,
-                "user_query": user_message,
-                "ai_response": full_response,
-                "created_at": activity.timestamp.isoformat() if activity.timestamp else None
-            }).execute()
-            logger.info("💾 메시지 저장 완료")
-        except Exception as save_error:
-            logger.warning(f"⚠️ 메시지 저장 실패 (비치명적): {save_error}")
+        # 💾 메시지 저장은 unified_chat_service.process_chat이 담당 (백그라운드 저장)
 
         return {"status": "success", "stream_id": stream_id}
 
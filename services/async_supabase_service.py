@@ -0,0 +1,59 @@
+# services/async_supabase_service.py
+"""
+⚡ Supabase 비동기 래퍼
+
+역할:
+- 동기(HTTP 블로킹) SupabaseService 호출을 전용 스레드 풀에서 실행
+- async 라우터/서비스에서 이벤트 루프 블로킹 방지 (다른 요청 지연 방지)
+
+책임: 실행 위치만 담당 (쿼리 로직은 supabase_service가 담당)
+
+※ 기본 스레드 풀(asyncio.to_thread) 대신 전용 풀 사용
+  → 동시 Supabase 호출 수 상한 (SUPABASE_EXECUTOR_MAX_WORKERS)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+
+from config import SUPABASE_EXECUTOR_MAX_WORKERS
+from services.supabase_service import SupabaseService, supabase_service
+
+T = TypeVar("T")
+
+_executor = ThreadPoolExecutor(
+    max_workers=SUPABASE_EXECUTOR_MAX_WORKERS,
+    thread_name_prefix="supabase-io"
+)
+
+
+async def run_sync(fn: Callable[..., T], *args, **kwargs) -> T:
+    """동기 함수를 Supabase 전용 스레드 풀에서 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    """스레드 풀 종료 (서버 종료 시 호출, 진행 중 작업은 완료 대기)"""
+    _executor.shutdown(wait=True)
+
+
+class AsyncSupabaseService:
+    """SupabaseService 비동기 래퍼 (같은 이름의 async 메서드 제공)"""
+
+    def __init__(self, service: Optional[SupabaseService] = None):
+        self.service = service or supabase_service
+
+    async def get_document_by_source_id(self, source: str, source_id: str) -> Optional[Dict]:
+        return await run_sync(self.service.get_document_by_source_id, source, source_id)
+
+    async def add_document(self, **kwargs) -> Dict:
+        return await run_sync(self.service.add_document, **kwargs)
+
+    async def delete_chunks_by_document_id(self, document_id: str) -> int:
+        return await run_sync(self.service.delete_chunks_by_document_id, document_id)
+
+
+# ✅ 싱글톤 인스턴스 (service role 클라이언트)
+async_supabase_service = AsyncSupabaseService()
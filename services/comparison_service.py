@@ -9,10 +9,13 @@
 책임: 비교 기능만 담당 (독립적, 테스트 용이)
 """
 
-from typing import Dict, List
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 from logging_config import get_logger
+import hashlib
 import re
 import json
+import threading
 
 logger = get_logger(__name__)
 
@@ -35,6 +38,32 @@ class ComparisonService:
     # 용어 정규화 (IMO DCS, IMO_DCS, IMODCS 모두 감지)
     ACRONYM_PATTERN = r'([A-Z][A-Z0-9]*(?:\s+[A-Z][A-Z0-9]*)?)'
 
+    # ✅ 정규식 사전 컴파일 (호출마다 re 모듈 캐시 조회/플래그 처리 생략)
+    _ACRONYM_RE = re.compile(ACRONYM_PATTERN)
+    _HISTORY_ACRONYM_RE = re.compile(r'\b[A-Z]{2,}(?:\s+[A-Z]{2,})?\b')
+    _NON_WORD_RE = re.compile(r'[^\w\s]')
+    _VS_RE = re.compile(r'([^\s,\.]+?)\s*(?:vs|VS|V\.S|versus)\s*([^\s,\.]+)', re.IGNORECASE)
+    _AND_RE = re.compile(r'([A-Z][A-Z0-9\s]*)\s*(?:과|와|그리고)\s*([A-Z][A-Z0-9\s]*)')
+
+    # 비교 의도 키워드 (단일 alternation → 키워드별 부분 문자열 탐색 대신 1회 스캔)
+    _INTENT_RE = re.compile("|".join(re.escape(k) for k in COMPARISON_KEYWORDS))
+
+    # 비교 구조 감지 패턴 (의미론적 감지용, 단일 alternation으로 1회 스캔)
+    _COMPARISON_STRUCTURE_RE = re.compile("|".join([
+        r'(?:첫|①|1(?:번째)?)\s*(?:과|와|그리고)\s*(?:두|②|2(?:번째)?)',  # 첫 번째와 두 번째
+        r'(?:이것|그것|A)\s*(?:과|와|그리고)\s*(?:저것|B)',  # 이것과 저것, A와 B
+        r'(?:전자|후자|앞|뒤)\s*(?:과|와|그리고)',  # 전자와 후자
+        r'(?:어느\s*것이|뭐가)\s*(?:다르|더|낫|좋)',  # 뭐가 더 좋아?, 어느게 나아?
+    ]))
+
+    # 감지 결과 캐시 크기 (같은 질문 + 같은 History 재요청 시 재계산 생략)
+    DETECTION_CACHE_SIZE = 512
+
+    # 감지 결과 LRU: (query, History/context 다이제스트) → 불변 튜플
+    # (원문 History 대신 16바이트 다이제스트를 키로 사용 → 항목마다 대화 전체를 보관하지 않음)
+    _detection_cache: "OrderedDict[Tuple[str, bytes], Tuple]" = OrderedDict()
+    _detection_lock = threading.Lock()
+
     @staticmethod
     def detect_comparison_mode(
             query: str,
@@ -42,7 +71,49 @@ class ComparisonService:
             conversation_context: List[Dict] = None
     ) -> Dict:
         """
-        향상된 비교 모드 감지
+        향상된 비교 모드 감지 (결과 캐시)
+
+        - 입력이 같으면 결과도 같음 (순수 함수) → (query, History + 최근 context 다이제스트)로 캐시
+        - 캐시에는 불변 튜플 저장, 호출마다 새 dict 반환 (호출부 수정이 캐시에 영향 없음)
+        """
+        history = history or ""
+        key = (query, ComparisonService._context_digest(history, conversation_context))
+
+        with ComparisonService._detection_lock:
+            cached = ComparisonService._detection_cache.get(key)
+            if cached is not None:
+                ComparisonService._detection_cache.move_to_end(key)
+
+        if cached is None:
+            result = ComparisonService._detect(query, history, conversation_context)
+            cached = tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in result.items())
+
+            with ComparisonService._detection_lock:
+                ComparisonService._detection_cache[key] = cached
+                while len(ComparisonService._detection_cache) > ComparisonService.DETECTION_CACHE_SIZE:
+                    ComparisonService._detection_cache.popitem(last=False)
+
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in cached}
+
+    @staticmethod
+    def _context_digest(history: str, conversation_context: List[Dict] = None) -> bytes:
+        """History + 최근 10개 context content 다이제스트 (감지에 쓰이는 부분만 반영)"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(history.encode("utf-8"))
+        if conversation_context:
+            for msg in conversation_context[-10:]:
+                h.update(b"\0")  # 구분자 (경계가 다른 입력끼리 같은 다이제스트 방지)
+                h.update((msg.get("content", "") or "").encode("utf-8"))
+        return h.digest()
+
+    @staticmethod
+    def _detect(
+            query: str,
+            history: str = "",
+            conversation_context: List[Dict] = None
+    ) -> Dict:
+        """
+        향상된 비교 모드 감지 (실제 계산)
 
         인자:
         - query: 현재 사용자 쿼리
@@ -113,19 +184,14 @@ class ComparisonService:
     @staticmethod
     def _check_comparison_intent(query: str) -> bool:
         """비교 의도 있는지 확인 (필수 조건)"""
-        comparison_words = ComparisonService.COMPARISON_KEYWORDS
-        return any(word in query.lower() for word in comparison_words)
+        return ComparisonService._INTENT_RE.search(query.lower()) is not None
 
     @staticmethod
     def _extract_vs_pattern(query: str) -> Dict:
         """'A vs B' 또는 'A와 B' 패턴 추출"""
 
         # 패턴 1: "A vs B" 형식
-        vs_match = re.search(
-            r'([^\s,\.]+?)\s*(?:vs|VS|V\.S|versus)\s*([^\s,\.]+)',
-            query,
-            re.IGNORECASE
-        )
+        vs_match = ComparisonService._VS_RE.search(query)
         if vs_match:
             return {
                 "is_comparison": True,
@@ -135,10 +201,7 @@ class ComparisonService:
             }
 
         # 패턴 2: "A와 B" 형식 (한국어)
-        and_match = re.search(
-            r'([A-Z][A-Z0-9\s]*)\s*(?:과|와|그리고)\s*([A-Z][A-Z0-9\s]*)',
-            query
-        )
+        and_match = ComparisonService._AND_RE.search(query)
         if and_match:
             topic1 = and_match.group(1).strip()
             topic2 = and_match.group(2).strip()
@@ -171,9 +234,9 @@ class ComparisonService:
         if conversation_context:
             for msg in reversed(conversation_context[-10:]):  # 최근 10개만
                 content = msg.get("content", "")
-                found = re.findall(ComparisonService.ACRONYM_PATTERN, content)
+                found = ComparisonService._ACRONYM_RE.findall(content)
                 for topic in found:
-                    normalized = re.sub(r'[^\w\s]', '', topic).strip()
+                    normalized = ComparisonService._NON_WORD_RE.sub('', topic).strip()
                     if normalized and normalized not in [t.replace(' ', '') for t in topics]:
                         topics.append(topic)
                         if len(topics) >= 3:
@@ -181,9 +244,9 @@ class ComparisonService:
 
         # 2. History 텍스트 활용 (폴백)
         if len(topics) < 2 and history_text:
-            found = re.findall(ComparisonService.ACRONYM_PATTERN, history_text)
+            found = ComparisonService._ACRONYM_RE.findall(history_text)
             for topic in found:
-                normalized = re.sub(r'[^\w\s]', '', topic).strip()
+                normalized = ComparisonService._NON_WORD_RE.sub('', topic).strip()
                 if normalized and normalized not in [t.replace(' ', '') for t in topics]:
                     topics.append(topic)
                     if len(topics) >= 3:
@@ -203,38 +266,29 @@ class ComparisonService:
         - "같은 점과 다른 점을 설명해줘"
         """
 
-        # 비교 구조 감지 패턴
-        comparison_structures = [
-            r'(?:첫|①|1(?:번째)?)\s*(?:과|와|그리고)\s*(?:두|②|2(?:번째)?)',  # 첫 번째와 두 번째
-            r'(?:이것|그것|A)\s*(?:과|와|그리고)\s*(?:저것|B)',  # 이것과 저것, A와 B
-            r'(?:전자|후자|앞|뒤)\s*(?:과|와|그리고)',  # 전자와 후자
-            r'(?:어느\s*것이|뭐가)\s*(?:다르|더|낫|좋)',  # 뭐가 더 좋아?, 어느게 나아?
-        ]
-
-        for pattern in comparison_structures:
-            if re.search(pattern, query):
-                # History에서 토픽 추출
-                topics = ComparisonService.extract_topics_from_history(history)
-                if len(topics) >= 2:
-                    logger.debug(f"✅ 의미론적 감지: {topics}")
-                    return {
-                        "is_comparison": True,
-                        "topics": topics[:2],
-                        "confidence": 0.80,
-                        "detection_method": "semantic"
-                    }
+        if ComparisonService._COMPARISON_STRUCTURE_RE.search(query):
+            # History에서 토픽 추출
+            topics = ComparisonService.extract_topics_from_history(history)
+            if len(topics) >= 2:
+                logger.debug(f"✅ 의미론적 감지: {topics}")
+                return {
+                    "is_comparison": True,
+                    "topics": topics[:2],
+                    "confidence": 0.80,
+                    "detection_method": "semantic"
+                }
 
         return {"is_comparison": False, "topics": [], "confidence": 0.0}
 
     @staticmethod
     def _extract_all_acronyms(query: str) -> List[str]:
         """쿼리에서 모든 대문자 약어 추출"""
-        matches = re.findall(ComparisonService.ACRONYM_PATTERN, query)
+        matches = ComparisonService._ACRONYM_RE.findall(query)
 
         seen = set()
         topics = []
         for match in matches:
-            normalized = re.sub(r'[^\w\s]', '', match).strip()
+            normalized = ComparisonService._NON_WORD_RE.sub('', match).strip()
             if normalized and normalized not in seen and len(normalized) >= 2:
                 topics.append(match)
                 seen.add(normalized)
@@ -247,8 +301,7 @@ class ComparisonService:
         if not history:
             return []
 
-        acronym_pattern = r'\b[A-Z]{2,}(?:\s+[A-Z]{2,})?\b'
-        matches = re.findall(acronym_pattern, history)
+        matches = ComparisonService._HISTORY_ACRONYM_RE.findall(history)
 
         if not matches:
             return []
@@ -257,7 +310,7 @@ class ComparisonService:
         topics = []
 
         for match in reversed(matches):
-            normalized = re.sub(r'[^\w\s]', '', match).strip()
+            normalized = ComparisonService._NON_WORD_RE.sub('', match).strip()
             if normalized and normalized not in seen and len(topics) < 3:
                 topics.append(match)
                 seen.add(normalized)
@@ -3,7 +3,6 @@
 import requests
 from typing import List, Dict, Any, Optional
 from config import CONFLUENCE_URL, CONFLUENCE_API_TOKEN, CONFLUENCE_SPACE_KEY
-import base64
 import re
 from unicodedata import normalize as unicode_normalize
 
@@ -36,15 +35,14 @@ class ConfluenceService:
         self.atlassian_id = atlassian_id.strip()
         self.api_token = api_token.strip()
 
-        # 기본 인증 (atlassian_id:token)
-        auth_string = f"{self.atlassian_id}:{self.api_token}"
-        encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-        self.headers = {
-            "Authorization": f"Basic {encoded_auth}",
+        # ✅ 세션 재사용 (페이지 조회마다 TCP/TLS 연결 재생성 방지)
+        # 기본 인증 (atlassian_id:token) → requests가 헤더 생성
+        self.session = requests.Session()
+        self.session.auth = (self.atlassian_id, self.api_token)
+        self.session.headers.update({
             "Accept": "application/json",
             "Content-Type": "application/json"
-        }
+        })
 
         print(f"✅ Confluence 클라이언트 초기화 완료 (Space: {self.space_key}, Atlassian ID: {self.atlassian_id})")
 
@@ -119,15 +117,8 @@ class ConfluenceService:
         self.atlassian_id = atlassian_id.strip()
         self.api_token = api_token.strip()
 
-        # ✨ 새로운 인증정보로 헤더 업데이트
-        auth_string = f"{self.atlassian_id}:{self.api_token}"
-        encoded_auth = base64.b64encode(auth_string.encode()).decode()
-
-        self.headers = {
-            "Authorization": f"Basic {encoded_auth}",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+        # ✨ 새로운 인증정보로 세션 인증 교체 (연결은 유지)
+        self.session.auth = (self.atlassian_id, self.api_token)
 
         print(f"✅ 자격증명 변경: '{old_atlassian_id}' → '{self.atlassian_id}'")
 
@@ -177,7 +168,7 @@ class ConfluenceService:
 
             print(f"  - 1️⃣ 모든 Space 조회 URL: {spaces_url}")
 
-            response = requests.get(spaces_url, headers=self.headers, params=spaces_params, timeout=30)
+            response = self.session.get(spaces_url, params=spaces_params, timeout=30)
             response.raise_for_status()
 
             all_spaces = response.json().get("results", [])
@@ -224,7 +215,7 @@ class ConfluenceService:
 
                 print(f"  - 2️⃣-{api_call_count + 1} 페이지 조회: {pages_url}" + (f" (cursor={cursor[:20]}...)" if cursor else ""))
 
-                response = requests.get(pages_url, headers=self.headers, params=pages_params, timeout=30)
+                response = self.session.get(pages_url, params=pages_params, timeout=30)
                 response.raise_for_status()
 
                 response_data = response.json()
@@ -279,7 +270,7 @@ class ConfluenceService:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -512,7 +503,7 @@ class ConfluenceService:
             spaces_url = f"{self.base_url}/api/v2/spaces"
             spaces_params = {"limit": 100}
 
-            response = requests.get(spaces_url, headers=self.headers, params=spaces_params, timeout=30)
+            response = self.session.get(spaces_url, params=spaces_params, timeout=30)
             response.raise_for_status()
 
             all_spaces = response.json().get("results", [])
@@ -546,7 +537,7 @@ class ConfluenceService:
                 if cursor:
                     pages_params["cursor"] = cursor
 
-                response = requests.get(pages_url, headers=self.headers, params=pages_params, timeout=30)
+                response = self.session.get(pages_url, params=pages_params, timeout=30)
                 response.raise_for_status()
 
                 response_data = response.json()
@@ -602,7 +593,7 @@ class ConfluenceService:
             spaces_url = f"{self.base_url}/api/v2/spaces"
             spaces_params = {"limit": 100}
 
-            response = requests.get(spaces_url, headers=self.headers, params=spaces_params, timeout=30)
+            response = self.session.get(spaces_url, params=spaces_params, timeout=30)
             response.raise_for_status()
 
             all_spaces = response.json().get("results", [])
@@ -638,7 +629,7 @@ class ConfluenceService:
 
                 print(f"  - 배치 {batch_count} 로드 중... (cursor={'있음' if cursor else '없음'})")
 
-                response = requests.get(pages_url, headers=self.headers, params=pages_params, timeout=30)
+                response = self.session.get(pages_url, params=pages_params, timeout=30)
                 response.raise_for_status()
 
                 response_data = response.json()
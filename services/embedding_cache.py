@@ -0,0 +1,161 @@
+# services/embedding_cache.py
+"""
+💾 임베딩 캐시
+
+역할:
+- (모델명, 청크 내용) 기준으로 계산된 임베딩 재사용
+- 재색인 시 변경되지 않은 청크의 임베딩 재계산 방지 (디스크)
+- 반복되는 검색 쿼리 임베딩 재사용 (메모리 LRU)
+
+책임: 임베딩 저장/조회만 담당 (모델 호출은 embedding_service가 담당)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentEmbeddingCache:
+    """SQLite 기반 디스크 임베딩 캐시 (float16 저장, 프로세스 재시작 후에도 유지)"""
+
+    # SQLite 바인딩 변수 제한(999) 이하로 IN 절 분할
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # ✅ 스키마/WAL 설정은 임시 연결로 수행 후 즉시 닫음
+        # (preload_app=True → 여기서 연 연결이 fork된 워커에 상속되면 안 됨)
+        self.path = path
+        with closing(sqlite3.connect(path, timeout=10.0)) as db:
+            db.execute("PRAGMA journal_mode=WAL")  # WAL은 파일에 유지됨
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            db.commit()
+
+        # ✅ 실제 연결은 프로세스별로 지연 생성 (_connection 참고)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._inherited: List[sqlite3.Connection] = []
+        logger.info(f"✅ 임베딩 캐시 초기화: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        현재 프로세스 전용 연결 반환 (self._lock 보유 상태에서 호출)
+
+        - fork 이후 PID가 바뀌면 새로 연결 (SQLite 연결은 fork 간 공유 불가)
+        - 상속된 연결은 닫지 않고 참조만 보관 (자식에서 close 시 부모 잠금/WAL 손상 위험)
+        - 워커 스레드에서도 사용 가능하도록 check_same_thread 해제 + 직접 락 관리
+        """
+        pid = os.getpid()
+        if self._db is None or self._db_pid != pid:
+            if self._db is not None:
+                self._inherited.append(self._db)
+            self._db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db_pid = pid
+        return self._db
+
+    @staticmethod
+    def make_key(model_name: str, content: str) -> bytes:
+        """캐시 키 생성 (모델명 포함 → 모델 변경 시 자동 무효화)"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(content.encode("utf-8"))
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """단일 조회 (없으면 None)"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """배치 조회 (적중한 키만 반환)"""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        with self._lock:
+            for i in range(0, len(unique_keys), self.QUERY_CHUNK_SIZE):
+                batch = unique_keys[i:i + self.QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection().execute(
+                    f"SELECT key, vec FROM embedding_cache WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, vec in rows:
+                    found[bytes(key)] = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+
+        return found
+
+    def put(self, key: bytes, vector) -> None:
+        """단일 저장"""
+        self.put_many({key: vector})
+
+    def put_many(self, items: Dict[bytes, "np.ndarray"]) -> None:
+        """배치 저장 (float16으로 변환하여 용량 절반)"""
+        if not items:
+            return
+
+        rows = [
+            (key, np.asarray(vector, dtype=np.float16).tobytes())
+            for key, vector in items.items()
+        ]
+
+        with self._lock:
+            db = self._connection()
+            db.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vec) VALUES (?, ?)",
+                rows
+            )
+            db.commit()
+
+
+class EmbeddingLRUCache:
+    """프로세스 메모리 LRU 임베딩 캐시 (쿼리 텍스트 해시 기준)"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str) -> bytes:
+        """정규화 텍스트(공백 제거 + 소문자) 기준 키"""
+        return hashlib.sha256(text.strip().lower().encode("utf-8")).digest()
+
+    def get_or_compute(self, text: str, fn: Callable[[str], List[float]]) -> List[float]:
+        """캐시 조회, 없으면 fn(text) 계산 후 저장 (반환값은 복사본)"""
+        key = self.make_key(text)
+
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+                return list(vector)
+
+        # 모델 호출은 락 밖에서 (동시 요청 직렬화 방지)
+        vector = fn(text)
+
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        return list(vector)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -2,24 +2,57 @@ from sentence_transformers import SentenceTransformer
 from typing import List
 import numpy as np
 import time
-from config import EMBEDDING_MODEL_NAME, EMBEDDING_MODEL_DIMENSION, EMBEDDING_BATCH_SIZE
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_MODEL_DIMENSION,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_QUERY_CACHE_SIZE,
+)
+from services.embedding_cache import EmbeddingLRUCache, PersistentEmbeddingCache
 
 
 class EmbeddingService:
+    # 디스크 캐시 키 접두어 (L2 정규화 도입 전 저장된 항목과 구분)
+    CACHE_KEY_NAMESPACE = f"{EMBEDDING_MODEL_NAME}:l2"
+
     def __init__(self):
         """BGE-m3-ko 모델 로드"""
         print(f"📚 Embedding 모델 로드 중: {EMBEDDING_MODEL_NAME}")
         self.model = SentenceTransformer(EMBEDDING_MODEL_NAME)
         print("✅ Embedding 모델 로드 완료")
 
-    def embed_text(self, text: str) -> List[float]:
-        """단일 텍스트를 벡터로 변환"""
-        embedding = self.model.encode(text, convert_to_tensor=False)
+        # ✅ 디스크 캐시 (실패해도 임베딩 자체는 동작)
+        self.cache = None
+        if EMBEDDING_CACHE_ENABLED:
+            try:
+                self.cache = PersistentEmbeddingCache(EMBEDDING_CACHE_PATH)
+            except Exception as e:
+                print(f"⚠️  임베딩 캐시 비활성화 (초기화 실패): {e}")
+
+        # ✅ 쿼리 임베딩 메모리 LRU (같은 질문/시맨틱 캐시 조회 + 검색 중복 계산 방지)
+        self.query_cache = (
+            EmbeddingLRUCache(maxsize=EMBEDDING_QUERY_CACHE_SIZE)
+            if EMBEDDING_QUERY_CACHE_SIZE > 0 else None
+        )
+
+    def _encode_one(self, text: str) -> List[float]:
+        # ✅ L2 정규화 (단위 벡터 → 코사인 유사도 = 내적)
+        embedding = self.model.encode(text, convert_to_tensor=False, normalize_embeddings=True)
         return embedding.astype(np.float32).tolist()
 
+    def embed_text(self, text: str) -> List[float]:
+        """단일 텍스트를 벡터로 변환 (메모리 LRU 적중 시 모델 호출 생략)"""
+        if self.query_cache is None:
+            return self._encode_one(text)
+        return self.query_cache.get_or_compute(text, self._encode_one)
+
     def embed_batch(self, texts: List[str], batch_size: int = None) -> List[List[float]]:
         """
         배치 임베딩 (메모리 효율적 - 2000+ 문서 지원)
+        - 디스크 캐시 적중분은 모델 호출 생략 (재색인 시 변경 없는 청크)
+        - L2 정규화된 단위 벡터 반환 (저장 시점 정규화 → 검색 시 내적만으로 유사도 계산)
 
         Args:
             texts: 임베딩할 텍스트 리스트
@@ -32,23 +65,52 @@ class EmbeddingService:
             return []
 
         batch_size = batch_size or EMBEDDING_BATCH_SIZE
-        all_embeddings = []
+        all_embeddings = [None] * len(texts)
+
+        # ✅ 캐시 조회 (적중 시 모델 호출 생략)
+        keys = []
+        if self.cache is not None:
+            keys = [PersistentEmbeddingCache.make_key(self.CACHE_KEY_NAMESPACE, t) for t in texts]
+            try:
+                cached = self.cache.get_many(keys)
+            except Exception as e:
+                print(f"⚠️  임베딩 캐시 조회 실패 (무시): {e}")
+                cached = {}
+            for idx, key in enumerate(keys):
+                if key in cached:
+                    all_embeddings[idx] = cached[key].tolist()
+
+        miss_indices = [idx for idx, emb in enumerate(all_embeddings) if emb is None]
+        miss_texts = [texts[idx] for idx in miss_indices]
 
-        print(f"🔤 배치 임베딩 시작: {len(texts)}개 텍스트 | 배치크기={batch_size}")
+        print(f"🔤 배치 임베딩 시작: {len(texts)}개 텍스트 | 캐시 적중={len(texts) - len(miss_texts)} | 배치크기={batch_size}")
         start_time = time.time()
 
         # 배치로 나누어 처리 (메모리 효율성)
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i+batch_size]
+        for i in range(0, len(miss_texts), batch_size):
+            batch = miss_texts[i:i+batch_size]
 
             try:
-                embeddings = self.model.encode(batch, convert_to_tensor=False)
-                all_embeddings.extend([emb.astype(np.float32).tolist() for emb in embeddings])
-
-                progress = min(i + batch_size, len(texts))
+                embeddings = self.model.encode(batch, convert_to_tensor=False, normalize_embeddings=True)
+                new_entries = {}
+                for offset, emb in enumerate(embeddings):
+                    idx = miss_indices[i + offset]
+                    vector = emb.astype(np.float32)
+                    all_embeddings[idx] = vector.tolist()
+                    if keys:
+                        new_entries[keys[idx]] = vector
+
+                # ✅ 캐시 저장 (실패해도 결과에는 영향 없음)
+                if new_entries:
+                    try:
+                        self.cache.put_many(new_entries)
+                    except Exception as e:
+                        print(f"⚠️  임베딩 캐시 저장 실패 (무시): {e}")
+
+                progress = min(i + batch_size, len(miss_texts))
                 elapsed = time.time() - start_time
-                progress_percent = (progress / len(texts)) * 100
-                print(f"  ✅ 진행: {progress}/{len(texts)} ({progress_percent:.1f}%) | {elapsed:.2f}초")
+                progress_percent = (progress / len(miss_texts)) * 100
+                print(f"  ✅ 진행: {progress}/{len(miss_texts)} ({progress_percent:.1f}%) | {elapsed:.2f}초")
 
             except Exception as e:
                 print(f"  ❌ 배치 임베딩 실패 (인덱스 {i}-{i+len(batch)}): {e}")
@@ -10,8 +10,10 @@
 책임: History 기능만 담당 (독립적, 재사용 가능)
 """
 
-from typing import List, Dict, Optional
+import asyncio
+from typing import List, Dict, Optional, Set
 from services.supabase_service import SupabaseService
+from services.async_supabase_service import run_sync
 from services.conversation_service import ConversationService
 from logging_config import get_logger
 from datetime import datetime
@@ -31,6 +33,9 @@ class HistoryService:
         """초기화"""
         self.supabase_client = supabase_client
 
+        # 백그라운드 저장 태스크 (GC 방지 + 종료 시 대기용)
+        self._pending_saves: Set[asyncio.Task] = set()
+
     async def load_conversation_history(
         self,
         user_id: str,
@@ -72,20 +77,15 @@ class HistoryService:
         try:
             logger.debug(f"📥 History 로드 시작: user_id={user_id}, limit={limit}")
 
-            # 최근 메시지 조회 (역순)
-            recent_messages = client.client.table("messages") \
-                .select("user_query,ai_response") \
-                .eq("user_id", user_id) \
-                .order("created_at", desc=True) \
-                .limit(limit) \
-                .execute()
+            # 최근 메시지 조회 (역순, 이벤트 루프 블로킹 없음)
+            recent_messages = await client.get_user_messages(user_id, limit)
 
-            if not recent_messages.data:
+            if not recent_messages:
                 logger.debug("⚠️ History 데이터 없음")
                 return ""
 
             # 메시지를 원래 순서로 정렬 (가장 오래된 것부터)
-            messages = list(reversed(recent_messages.data))
+            messages = list(reversed(recent_messages))
 
             # 프롬프트 형식으로 변환
             history_parts = []
@@ -228,7 +228,10 @@ class HistoryService:
             # 재시도 로직 (최대 2회)
             for attempt in range(2):
                 try:
-                    client.client.table("messages").insert(message_data).execute()
+                    # 동기 HTTP 호출 → 워커 스레드 (이벤트 루프 블로킹 방지)
+                    await run_sync(
+                        client.client.table("messages").insert(message_data).execute
+                    )
 
                     logger.info("💾 메시지 저장 성공", extra={
                         "user_id": user_id,
@@ -248,6 +251,37 @@ class HistoryService:
             logger.error(f"❌ 메시지 저장 최종 실패: {e}", exc_info=True)
             return False
 
+    def save_message_background(self, **kwargs) -> asyncio.Task:
+        """
+        save_message를 백그라운드 태스크로 실행 (응답 완료 신호를 저장 대기 없이 전송)
+
+        - 인자는 save_message와 동일
+        - 저장 실패는 save_message 내부에서 로깅 (비치명적)
+        - 서버 종료 시 drain_pending_saves()로 완료 대기
+        """
+        task = asyncio.create_task(self.save_message(**kwargs))
+        self._pending_saves.add(task)
+        task.add_done_callback(self._on_save_done)
+        return task
+
+    def _on_save_done(self, task: asyncio.Task) -> None:
+        self._pending_saves.discard(task)
+
+        if task.cancelled():
+            logger.warning("⚠️ 메시지 저장 취소됨")
+        elif task.exception() is not None:
+            logger.warning(f"⚠️ 메시지 저장 실패 (비치명적): {task.exception()}")
+        elif not task.result():
+            logger.warning("⚠️ 메시지 저장 실패 (비치명적)")
+
+    async def drain_pending_saves(self) -> None:
+        """진행 중인 백그라운드 저장 완료 대기 (서버 종료 시 호출)"""
+        if not self._pending_saves:
+            return
+
+        logger.info(f"💾 대기 중인 메시지 저장 {len(self._pending_saves)}건 완료 대기")
+        await asyncio.gather(*self._pending_saves, return_exceptions=True)
+
     @staticmethod
     def extract_conversation_context(
         history: str,
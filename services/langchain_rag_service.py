@@ -1,16 +1,13 @@
 import re
 import logging
+from functools import lru_cache
 from unicodedata import normalize as unicode_normalize
 from typing import List, Dict, Any, Generator, Optional, Tuple
-from datetime import datetime
 
 # LangChain 1.0 Import
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.embeddings import Embeddings
-from langchain_core.tools import tool
-from langchain.agents import create_agent
 
 from services.embedding_service import embedding_service
 from services.supabase_service import supabase_service, SupabaseService
@@ -179,11 +176,17 @@ class SupabaseRetriever:
             error_msg = f"검색 중 오류: {str(e)}"
             return error_msg, error_msg, []
 
-    def search_hybrid(self, query: str, use_reranking: bool = None) -> Tuple[str, str, List[Dict]]:
+    def search_hybrid(
+            self,
+            query: str,
+            use_reranking: bool = None,
+            query_embedding: Optional[List[float]] = None
+    ) -> Tuple[str, str, List[Dict]]:
         """
         하이브리드 검색 (PGroonga + pgvector) + 리랭킹 + URL 자동 추가
 
         ✅ 변경: 2개 컨텍스트 반환 (user_context, llm_context)
+        ✅ query_embedding 전달 시 재계산 생략 (시맨틱 캐시 조회에 사용한 임베딩 재사용)
 
         Returns:
             Tuple[str, str, List[Dict]]:
@@ -196,8 +199,9 @@ class SupabaseRetriever:
             use_reranking = RERANKER_CONFIG['enabled']
 
         try:
-            # 1. 쿼리 임베딩 생성
-            query_embedding = self.embeddings.embed_query(query)
+            # 1. 쿼리 임베딩 생성 (미리 계산된 임베딩이 없을 때만)
+            if query_embedding is None:
+                query_embedding = self.embeddings.embed_query(query)
 
             # 2. Supabase RPC 호출 (하이브리드 검색)
             response = self.supabase_client.client.rpc(
@@ -643,6 +647,41 @@ COMPARISON_USER_TEMPLATE = """【검색된 문서】
   URL: https://[전체경로]
 """
 
+# ===== 프롬프트 사전 구성 (모드 조합별 1회) =====
+
+class _BlankDict(dict):
+    """누락된 템플릿 변수는 빈 문자열로 대체 (str.format_map용)"""
+
+    def __missing__(self, key):
+        return ""
+
+
+def _prompt_texts(table_mode: bool, is_comparison: bool) -> Tuple[str, str]:
+    """모드 조합별 (시스템 프롬프트, 사용자 메시지 템플릿) 문자열 선택"""
+    system_prompt = VEDDY_SYSTEM_PROMPT + TABLE_MODE_PROMPT if table_mode else VEDDY_SYSTEM_PROMPT
+
+    if is_comparison:
+        user_template = COMPARISON_CONTEXT_TEMPLATE + "\n\n" + COMPARISON_USER_TEMPLATE
+    elif table_mode:
+        user_template = TABLE_USER_MESSAGE_TEMPLATE
+    else:
+        user_template = USER_MESSAGE_TEMPLATE
+
+    return system_prompt, user_template
+
+
+@lru_cache(maxsize=32)
+def _build_prompt_prefix(table_mode: bool, is_comparison: bool) -> Tuple[SystemMessage, str]:
+    """
+    (시스템 메시지, 사용자 메시지 템플릿) 반환
+
+    - 시스템 프롬프트는 변수가 없으므로 메시지 객체까지 미리 생성
+    - 사용자 템플릿만 요청마다 str.format_map으로 채움 (템플릿 객체 검증/파싱 생략)
+    """
+    system_prompt, user_template = _prompt_texts(table_mode, is_comparison)
+    return SystemMessage(content=system_prompt), user_template
+
+
 # ===== LangChain 1.0 RAG 서비스 (완전 개선) =====
 
 class LangChainRAGService:
@@ -665,30 +704,7 @@ class LangChainRAGService:
             streaming=True
         )
 
-        # 3. 프롬프트 템플릿 (개선됨)
-        self.base_prompt_template = ChatPromptTemplate.from_messages([
-            ("system", VEDDY_SYSTEM_PROMPT),
-            ("user", USER_MESSAGE_TEMPLATE)
-        ])
-
-        self.table_prompt_template = ChatPromptTemplate.from_messages([
-            ("system", VEDDY_SYSTEM_PROMPT + TABLE_MODE_PROMPT),
-            ("user", TABLE_USER_MESSAGE_TEMPLATE)
-        ])
-
-        # 비교 모드 프롬프트 템플릿
-        self.comparison_prompt_template = ChatPromptTemplate.from_messages([
-            ("system", VEDDY_SYSTEM_PROMPT),
-            ("user", COMPARISON_CONTEXT_TEMPLATE + "\n\n" + COMPARISON_USER_TEMPLATE)
-        ])
-
-        # 비교 + 테이블 하이브리드 프롬프트
-        self.comparison_table_prompt_template = ChatPromptTemplate.from_messages([
-            ("system", VEDDY_SYSTEM_PROMPT + TABLE_MODE_PROMPT),
-            ("user", COMPARISON_CONTEXT_TEMPLATE + "\n\n" + COMPARISON_USER_TEMPLATE)
-        ])
-
-        # 4. Retriever 싱글톤
+        # 3. Retriever 싱글톤
         self._retriever = None
 
         logger.info("✅ LangChain 1.0 RAG Service 초기화 완료 (프롬프트 완전 개선 + URL 자동 추가 + History)")
@@ -703,19 +719,6 @@ class LangChainRAGService:
             )
         return self._retriever
 
-    def _safe_format(self, template: ChatPromptTemplate, **kwargs) -> list:
-        """안전한 format_messages (선택적 파라미터 처리)"""
-        required_vars = template.input_variables
-        safe_kwargs = {}
-
-        for var in required_vars:
-            if var in kwargs:
-                safe_kwargs[var] = kwargs[var]
-            else:
-                safe_kwargs[var] = ""  # 기본값: 빈 문자열
-
-        return template.format_messages(**safe_kwargs)
-
     def _normalize_response(self, response: str) -> str:
         """✅ 응답 텍스트 정규화 (자모 분리 복구)"""
         # 1. 유니코드 정규화
@@ -741,7 +744,8 @@ class LangChainRAGService:
             supabase_client: Optional[SupabaseService] = None,
             history: str = None,
             comparison_info: dict = None,
-            conversation_context: List[Dict] = None
+            conversation_context: List[Dict] = None,
+            query_embedding: Optional[List[float]] = None
     ) -> Generator[str, None, None]:
         """
         RAG 스트리밍 응답 (테이블 모드 + 비교 모드 조합 가능)
@@ -777,14 +781,14 @@ class LangChainRAGService:
             else:
                 # ✅ 일반 모드: 일반 하이브리드 검색 (3개 반환값)
                 logger.info("📝 일반 모드 검색")
-                user_context, llm_context, raw_chunks = self.retriever.search_hybrid(query)
+                user_context, llm_context, raw_chunks = self.retriever.search_hybrid(
+                    query, query_embedding=query_embedding
+                )
                 is_in_comparison_mode = False
 
-            # 🎯 Step 2: 프롬프트 선택 (table_mode 기반)
-            prompt_template = self._select_prompt_template(
-                table_mode=table_mode,
-                is_comparison=is_in_comparison_mode,
-                topics=topics if is_in_comparison_mode else []
+            # 🎯 Step 2: 프롬프트 선택 (table_mode 기반, 모드 조합별 캐시)
+            system_message, user_template = self._select_prompt_template(
+                table_mode, is_in_comparison_mode, topics
             )
 
             logger.info("📋 프롬프트 선택", extra={
@@ -794,17 +798,21 @@ class LangChainRAGService:
                 "llm_context_length": len(llm_context)  # ✅ 길이 비교 로깅
             })
 
-            # ✅ Step 3: 메시지 포맷 (LLM용 간소화 컨텍스트 사용)
-            messages = self._safe_format(
-                prompt_template,
-                context=llm_context,  # 🚀 핵심: LLM에는 간소화 컨텍스트만!
-                query=query,
-                history=history or "",
-                topics=", ".join(topics) if is_in_comparison_mode else ""
-            )
+            # ✅ Step 3: 메시지 포맷 (LLM용 간소화 컨텍스트 사용, 동적 부분만 채움)
+            messages = [
+                system_message,
+                HumanMessage(content=user_template.format_map(_BlankDict(
+                    context=llm_context,  # 🚀 핵심: LLM에는 간소화 컨텍스트만!
+                    query=query,
+                    history=history or "",
+                    topics=", ".join(topics) if is_in_comparison_mode else ""
+                )))
+            ]
 
             # ✅ Step 4: 스트리밍
-            for chunk in self.llm.stream(messages):
+            # prompt_cache_key: 같은 시스템 프롬프트(모드 조합)끼리 같은 캐시로 라우팅 → OpenAI 프롬프트 캐시 적중률 향상
+            prompt_cache_key = f"veddy:{'table' if table_mode else 'text'}:{'cmp' if is_in_comparison_mode else 'std'}"
+            for chunk in self.llm.stream(messages, prompt_cache_key=prompt_cache_key):
                 if hasattr(chunk, 'content') and chunk.content:
                     token = unicode_normalize('NFC', chunk.content)
                     yield token
@@ -823,34 +831,15 @@ class LangChainRAGService:
             table_mode: bool,
             is_comparison: bool,
             topics: List[str] = None
-    ) -> ChatPromptTemplate:
+    ) -> Tuple[SystemMessage, str]:
         """
-        프롬프트 템플릿 선택 (테이블 + 모드 조합)
+        프롬프트 선택 (테이블 + 모드 조합, 유일한 프롬프트 경로)
 
-        로직:
-        1. table_mode 확인 → base 선택 (table vs normal)
-        2. is_comparison 확인 → 프롬프트 내용 추가
+        - 반환: (시스템 메시지, 사용자 메시지 템플릿) → 사용자 템플릿은 호출부에서 format_map으로 채움
+        - 캐시 키는 (table_mode, is_comparison)만 사용 (topics는 로그용, 조합당 1회 생성)
         """
-
-        # ✅ 비교 모드 + 테이블 형식 (하이브리드)
-        if is_comparison and table_mode:
-            logger.info(f"📋 비교 + 테이블 프롬프트 선택 (주제: {topics})")
-            return self.comparison_table_prompt_template
-
-        # ✅ 비교 모드 + 일반 형식
-        elif is_comparison:
-            logger.info(f"📋 비교 프롬프트 선택 (주제: {topics})")
-            return self.comparison_prompt_template
-
-        # ✅ 일반 모드 + 테이블 형식
-        elif table_mode:
-            logger.info("📋 테이블 프롬프트 선택")
-            return self.table_prompt_template
-
-        # ✅ 일반 모드 + 일반 형식
-        else:
-            logger.info("📋 일반 프롬프트 선택")
-            return self.base_prompt_template
+        logger.debug(f"📋 프롬프트 선택 | table={bool(table_mode)} | 비교={bool(is_comparison)} | 주제={topics}")
+        return _build_prompt_prefix(bool(table_mode), bool(is_comparison))
 
 # 글로벌 인스턴스
 langchain_rag_service = LangChainRAGService()
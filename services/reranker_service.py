@@ -2,6 +2,7 @@
 
 from typing import List, Dict, Any
 from sentence_transformers import CrossEncoder
+import numpy as np
 import torch
 import logging
 from config import RERANKER_CONFIG
@@ -65,14 +66,19 @@ class RerankerService:
             logger.info(f"🔍 리랭킹 시작 (청크 수: {len(pairs)})")
             scores = self.model.predict(pairs)
 
-            for i, chunk in enumerate(chunks):
-                chunk['rerank_score'] = float(scores[i])
+            scores = np.asarray(scores, dtype=np.float32)
+            for chunk, score in zip(chunks, scores.tolist()):
+                chunk['rerank_score'] = score
 
-            reranked = sorted(
-                chunks,
-                key=lambda x: x.get('rerank_score', 0),
-                reverse=True
-            )[:top_k]
+            # ✅ 상위 k개만 선택 (argpartition O(N)) 후 k개만 정렬
+            k = min(top_k, len(chunks))
+            if k < len(chunks):
+                top_idx = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top_idx = np.arange(len(chunks))
+            top_idx = top_idx[np.argsort(-scores[top_idx], kind="stable")]
+
+            reranked = [chunks[i] for i in top_idx]
 
             logger.info(f"✅ 리랭킹 완료 (상위 {top_k}개 반환)")
 
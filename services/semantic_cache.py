@@ -0,0 +1,149 @@
+# services/semantic_cache.py
+"""
+⚡ 시맨틱 응답 캐시
+
+역할:
+- 거의 동일한 질문("IMO DCS가 뭐야?" / "IMO DCS가 뭐야")의 RAG 응답 재사용
+- 쿼리 임베딩 코사인 유사도 기준 조회 (검색 + LLM 생성 생략)
+
+책임: 응답 저장/조회만 담당 (임베딩 생성, 스트리밍은 호출부가 담당)
+
+※ 사용자 + 응답 모드(테이블/비교 토픽)별 네임스페이스 분리 → 다른 사용자/모드 응답 노출 없음
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from config import SEMANTIC_CACHE_CONFIG
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """캐시된 응답"""
+    response: str
+    source_chunk_ids: Tuple[str, ...]
+    created_at: float
+
+
+class SemanticCache:
+    """임베딩 유사도 기반 응답 캐시 (LRU + TTL)"""
+
+    def __init__(
+            self,
+            threshold: float = 0.97,
+            max_entries: int = 10000,
+            ttl_seconds: float = 3600.0
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # namespace → {entry_id: (정규화 임베딩, 응답)}
+        self._namespaces: Dict[Hashable, Dict[int, Tuple[np.ndarray, CachedResponse]]] = {}
+        # 전체 항목 LRU 순서 (namespace, entry_id)
+        self._lru: "OrderedDict[Tuple[Hashable, int], None]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        # np.linalg.norm 대신 sqrt(v·v) (호출 오버헤드 감소)
+        norm = float(np.sqrt(np.vdot(vector, vector)))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _remove(self, namespace: Hashable, entry_id: int) -> None:
+        entries = self._namespaces.get(namespace)
+        if entries is not None:
+            entries.pop(entry_id, None)
+            if not entries:
+                del self._namespaces[namespace]
+        self._lru.pop((namespace, entry_id), None)
+
+    def lookup(self, namespace: Hashable, embedding: List[float]) -> Optional[CachedResponse]:
+        """
+        유사 질문의 캐시 응답 조회
+
+        반환:
+        CachedResponse (유사도 ≥ threshold) 또는 None
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        now = time.time()
+
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if not entries:
+                return None
+
+            # 만료 항목 정리 (해당 namespace만)
+            expired = [
+                entry_id for entry_id, (_, cached) in entries.items()
+                if now - cached.created_at > self.ttl_seconds
+            ]
+            for entry_id in expired:
+                self._remove(namespace, entry_id)
+
+            entries = self._namespaces.get(namespace)
+            if not entries:
+                return None
+
+            entry_ids = list(entries.keys())
+            similarities = np.stack([entries[i][0] for i in entry_ids]) @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            entry_id = entry_ids[best]
+            self._lru.move_to_end((namespace, entry_id))
+            logger.debug(f"⚡ 시맨틱 캐시 적중 (유사도={similarities[best]:.4f})")
+            return entries[entry_id][1]
+
+    def insert(
+            self,
+            namespace: Hashable,
+            embedding: List[float],
+            response: str,
+            source_chunk_ids: Optional[List[str]] = None
+    ) -> None:
+        """응답 저장 (최대 개수 초과 시 가장 오래 사용되지 않은 항목 제거)"""
+        vector = self._normalize(embedding)
+        if vector is None or not response:
+            return
+
+        cached = CachedResponse(
+            response=response,
+            source_chunk_ids=tuple(source_chunk_ids or ()),
+            created_at=time.time()
+        )
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._namespaces.setdefault(namespace, {})[entry_id] = (vector, cached)
+            self._lru[(namespace, entry_id)] = None
+
+            while len(self._lru) > self.max_entries:
+                (old_namespace, old_id), _ = self._lru.popitem(last=False)
+                self._remove(old_namespace, old_id)
+
+
+# ✅ 싱글톤 인스턴스
+semantic_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_CONFIG['threshold'],
+    max_entries=SEMANTIC_CACHE_CONFIG['max_entries'],
+    ttl_seconds=SEMANTIC_CACHE_CONFIG['ttl_seconds']
+)
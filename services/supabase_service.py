@@ -1,20 +1,46 @@
 # services/supabase_service.py (✨ get_document_by_source_id 메서드 추가)
 
 from supabase import create_client, Client
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from config import SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_ROLE_KEY
 from unicodedata import normalize as unicode_normalize
 from config import VECTOR_SEARCH_CONFIG
 from datetime import datetime
 from typing import Optional
+from uuid import UUID
+from db.pool import get_pool
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+
+async def _run_sync(fn, *args, **kwargs):
+    """REST 폴백용 블로킹 호출 → Supabase 전용 스레드 풀 (동시 호출 수 상한 공유)"""
+    # async_supabase_service가 이 모듈을 import하므로 지연 import (순환 참조 방지)
+    from services.async_supabase_service import run_sync
+    return await run_sync(fn, *args, **kwargs)
+
+
 class SupabaseService:
     # ✅ 클래스 레벨 클라이언트 (싱글톤)
     _service_role_client: Optional[Client] = None
 
+    # ✅ 사용자(RLS) 클라이언트 캐시: access_token → SupabaseService
+    # (같은 세션의 연속 요청마다 create_client + TLS 연결 재생성 방지)
+    _USER_CLIENT_CACHE_SIZE = 256
+    _user_clients: "OrderedDict[str, SupabaseService]" = OrderedDict()
+    _user_clients_lock = threading.Lock()
+
+    # ✅ 검색 기본값 (import 시 1회만 조회)
+    _DEFAULT_THRESHOLD = VECTOR_SEARCH_CONFIG['similarity_threshold']
+    _DEFAULT_EF = VECTOR_SEARCH_CONFIG['ef_search']
+    _MATCH_RPC = 'match_documents_halfvec' if VECTOR_SEARCH_CONFIG['use_halfvec'] else 'match_documents'
+
+    # ✅ 문서 조회 컬럼 (본문 content 제외 → 응답 크기/JSON 파싱 비용 감소)
+    _DOCUMENT_SUMMARY_COLUMNS = "id, source, source_id, title, metadata, is_active, created_at, updated_at"
+
     def __init__(self, access_token: Optional[str] = None):
         """
         Supabase 클라이언트 초기화
@@ -41,6 +67,43 @@ class SupabaseService:
 
             self.client = SupabaseService._service_role_client
 
+    @classmethod
+    def for_user(cls, access_token: str) -> "SupabaseService":
+        """
+        사용자 토큰용 클라이언트 조회 (없으면 생성 후 캐시)
+
+        - 토큰 갱신 시 새 키로 생성, 오래된 항목은 LRU로 제거
+        - 만료 토큰은 verify_supabase_token에서 먼저 거부됨
+        """
+        with cls._user_clients_lock:
+            service = cls._user_clients.get(access_token)
+            if service is not None:
+                cls._user_clients.move_to_end(access_token)
+                return service
+
+        service = cls(access_token=access_token)
+
+        # ※ 제거된 클라이언트는 닫지 않음 (백그라운드 저장 등 진행 중인 작업이 아직 참조 가능)
+        #   → 마지막 참조가 사라지면 GC가 HTTP 세션 정리
+        with cls._user_clients_lock:
+            cls._user_clients[access_token] = service
+            while len(cls._user_clients) > cls._USER_CLIENT_CACHE_SIZE:
+                cls._user_clients.popitem(last=False)
+
+        return service
+
+    @staticmethod
+    def _record_to_dict(record) -> Dict[str, Any]:
+        """asyncpg Record → REST 응답과 동일한 형태의 dict (UUID/시간은 문자열)"""
+        result = {}
+        for key, value in record.items():
+            if isinstance(value, UUID):
+                value = str(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            result[key] = value
+        return result
+
     def test_connection(self) -> bool:
         """Supabase 연결 테스트"""
         try:
@@ -62,10 +125,10 @@ class SupabaseService:
             source_id: 출처 내 고유 ID (예: Confluence page_id)
 
         Returns:
-            기존 문서 정보 또는 None
+            기존 문서 정보 또는 None (본문 content 제외)
         """
         try:
-            response = self.client.table("documents").select("*").eq(
+            response = self.client.table("documents").select(self._DOCUMENT_SUMMARY_COLUMNS).eq(
                 "source", source
             ).eq(
                 "source_id", source_id
@@ -159,12 +222,22 @@ class SupabaseService:
             logger.error(f"❌ 문서 저장 중 오류: {e}")
             raise
 
-    def list_documents(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """문서 목록"""
+    async def list_documents(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """문서 목록 (Postgres 풀 우선, 미설정 시 REST, 본문 content 제외)"""
         try:
-            response = self.client.table("documents").select("*").eq(
-                "is_active", True
-            ).limit(limit).execute()
+            pool = await get_pool()
+            if pool is not None:
+                rows = await pool.fetch(
+                    f"SELECT {self._DOCUMENT_SUMMARY_COLUMNS} FROM documents WHERE is_active = true LIMIT $1",
+                    limit
+                )
+                return [self._record_to_dict(row) for row in rows]
+
+            response = await _run_sync(
+                self.client.table("documents").select(self._DOCUMENT_SUMMARY_COLUMNS).eq(
+                    "is_active", True
+                ).limit(limit).execute
+            )
             return response.data
         except Exception as e:
             logger.error(f"❌ 목록 조회 실패: {e}")
@@ -213,12 +286,12 @@ class SupabaseService:
             삭제된 청크 개수
         """
         try:
-            # 삭제 전 개수 확인
+            # 삭제 전 개수 확인 (head=True: Content-Range 헤더로 개수만 수신, 본문 없음)
             count_response = self.client.table("document_chunks").select(
-                "id", count="exact"
+                "id", count="exact", head=True
             ).eq("document_id", document_id).execute()
 
-            count = len(count_response.data) if count_response.data else 0
+            count = count_response.count or 0
 
             if count == 0:
                 logger.debug(f"🗑️  삭제할 청크 없음 (document_id: {document_id})")
@@ -261,7 +334,7 @@ class SupabaseService:
 
         batch_size = 10  # Supabase 권장: 한 번에 10개씩
         total_saved = 0
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         logger.info(f"📦 배치 청크 저장 시작: {len(chunks_data)}개 청크")
 
@@ -275,16 +348,18 @@ class SupabaseService:
                     saved_count = len(response.data) if response.data else 0
                     total_saved += saved_count
 
-                    elapsed = time.time() - start_time
-                    batch_num = (i // batch_size) + 1
-                    print(f"  ✅ 배치 {batch_num}: {saved_count}개 저장 ({elapsed:.2f}초)")
+                    # ✅ DEBUG 비활성 시 포맷팅 비용 없음 (print는 stdout 락 + flush 유발)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        elapsed = time.perf_counter() - start_time
+                        batch_num = (i // batch_size) + 1
+                        logger.debug("  ✅ 배치 %d: %d개 저장 (%.2f초)", batch_num, saved_count, elapsed)
 
                 except Exception as e:
                     logger.error(f"❌ 배치 저장 실패 (인덱스 {i}-{i+len(batch)}): {e}")
                     # 계속 진행 (부분 실패 허용)
                     continue
 
-            elapsed = time.time() - start_time
+            elapsed = time.perf_counter() - start_time
             logger.info(f"✅ 배치 저장 완료: {total_saved}개 청크 저장됨 ({elapsed:.2f}초)")
 
             return total_saved
@@ -293,70 +368,137 @@ class SupabaseService:
             logger.error(f"❌ 배치 저장 중 오류: {e}")
             return total_saved
 
+    async def add_chunks_bulk(
+            self,
+            document_id: str,
+            items: List[Tuple[int, str, List[float]]]
+    ) -> int:
+        """
+        ✅ 문서 청크 일괄 저장 (Postgres COPY, 왕복 1회)
+
+        Args:
+            document_id: 문서 ID
+            items: [(chunk_number, content, embedding), ...]
+
+        Returns:
+            저장된 청크 개수
+
+        Raises:
+            저장 실패 또는 일부만 저장된 경우 예외 (호출부가 이미 기존 청크를 삭제했으므로
+            0 반환으로 넘기면 문서의 청크가 조용히 사라짐 → 호출부에서 오류로 보고)
+
+        ※ Postgres 풀 미설정 시 add_chunks_batch(REST)로 폴백
+        """
+        if not items:
+            return 0
+
+        records = [
+            (document_id, chunk_number, unicode_normalize('NFC', content), embedding)
+            for chunk_number, content, embedding in items
+        ]
+
+        pool = await get_pool()
+        if pool is None:
+            saved_count = await _run_sync(self.add_chunks_batch, [
+                {"document_id": doc_id, "chunk_number": n, "content": c, "embedding": e}
+                for doc_id, n, c, e in records
+            ])
+            if saved_count < len(records):
+                raise RuntimeError(
+                    f"청크 일부 저장 실패: {saved_count}/{len(records)} (document_id: {document_id})"
+                )
+            return saved_count
+
+        columns = ["document_id", "chunk_number", "content", "embedding"]
+
+        try:
+            async with pool.acquire() as conn:
+                try:
+                    await conn.copy_records_to_table(
+                        "document_chunks", records=records, columns=columns
+                    )
+                except Exception as copy_error:
+                    # COPY 불가 (pgvector 코덱 없음 / 풀러 제약) → executemany + 텍스트 캐스팅
+                    logger.warning(f"⚠️ COPY 실패, executemany로 재시도: {copy_error}")
+                    await conn.executemany(
+                        "INSERT INTO document_chunks (document_id, chunk_number, content, embedding) "
+                        "VALUES ($1, $2, $3, $4::text::vector)",
+                        [
+                            (doc_id, n, c, "[" + ",".join(map(str, e)) + "]")
+                            for doc_id, n, c, e in records
+                        ]
+                    )
+
+            logger.info(f"✅ 청크 일괄 저장: {len(records)}개 (document_id: {document_id})")
+            return len(records)
+
+        except Exception as e:
+            logger.error(f"❌ 청크 일괄 저장 실패 (document_id: {document_id}): {e}")
+            raise
+
+    @staticmethod
+    def _to_search_result(item: Dict[str, Any]) -> Dict[str, Any]:
+        """match_documents RPC 행 → 검색 결과 dict"""
+        metadata = item.get('metadata') or {}
+        return {
+            'id': item.get('id'),
+            'document_id': item.get('document_id'),
+            'content': item.get('content', ''),
+            'similarity': item.get('similarity', 0.0),
+            'title': item.get('title', '제목 없음'),
+            'source': item.get('source', 'confluence'),
+            'url': metadata.get('url') or metadata.get('page_url', ''),
+            'metadata': metadata
+        }
+
     def search_chunks(self, embedding: List[float], limit: int = 5,
-                      threshold: float = None, ef_search: int = None) -> List[Dict[str, Any]]:
+                      threshold: float = None, ef_search: int = None,
+                      source_filter: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         벡터 유사도 검색 (config 기반 + 성능 모니터링)
+
+        - 임계값/출처 필터/top-k는 match_documents RPC에서 처리 (db/sql/match_documents.sql)
+        - VECTOR_USE_HALFVEC=true: halfvec 컬럼 검색 RPC 사용 (db/sql/halfvec_migration.sql)
+        - source_filter: 검색할 문서 출처 목록 (예: ["confluence"], None이면 전체)
         """
         import time
 
-        # ✅ config에서 기본값 자동 적용
-        config_threshold = VECTOR_SEARCH_CONFIG['similarity_threshold']
-        config_ef_search = VECTOR_SEARCH_CONFIG['ef_search']
-
-        threshold = threshold or config_threshold
-        ef_search = ef_search or config_ef_search
+        # ✅ config 기본값 적용 (threshold=0.0도 유효한 값이므로 None만 대체)
+        threshold = threshold if threshold is not None else self._DEFAULT_THRESHOLD
+        ef_search = ef_search if ef_search is not None else self._DEFAULT_EF
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             logger.info(f"🔍 검색 시작 | ef={ef_search} | threshold={threshold} | limit={limit}")
 
-            # RPC 호출
-            response = self.client.rpc('match_documents', {
+            params = {
                 'query_embedding': embedding,
                 'match_count': limit,
                 'match_threshold': threshold,
                 'ef_search_value': ef_search
-            }).execute()
+            }
+            # 필터 지정 시에만 전달 (미지정 호출은 이전 RPC 시그니처와 호환)
+            if source_filter:
+                params['source_filter'] = list(source_filter)
+
+            # RPC 호출
+            response = self.client.rpc(self._MATCH_RPC, params).execute()
 
             data = response.data if hasattr(response, 'data') else response
 
             if not data:
-                elapsed = (time.time() - start_time) * 1000
+                elapsed = (time.perf_counter() - start_time) * 1000
                 logger.warning(f"⚠️ 검색 결과 없음 | ef={ef_search} | 시간={elapsed:.2f}ms")
                 return []
 
             logger.info(f"✅ RPC 응답: {len(data)}개")
 
-            results = []
-            similarities = []
-
-            for i, item in enumerate(data, 1):
-                chunk_id = item.get('id')
-                doc_id = item.get('document_id')
-                content = item.get('content', '')
-                similarity = item.get('similarity', 0.0)
-                title = item.get('title', '제목 없음')
-                source = item.get('source', 'confluence')
-                metadata = item.get('metadata', {})
-
-                similarities.append(similarity)
-
-                chunk_data = {
-                    'id': chunk_id,
-                    'document_id': doc_id,
-                    'content': content,
-                    'similarity': similarity,
-                    'title': title,
-                    'source': source,
-                    'url': metadata.get('url') or metadata.get('page_url', ''),
-                    'metadata': metadata
-                }
-
-                results.append(chunk_data)
-
-            elapsed = (time.time() - start_time) * 1000
+            # ✅ 행 변환은 map으로 일괄 처리 (루프 내 지역변수/리스트 append 제거)
+            results = list(map(self._to_search_result, data))
+            similarities = [r['similarity'] for r in results]
+
+            elapsed = (time.perf_counter() - start_time) * 1000
             avg_similarity = sum(similarities) / len(similarities) if similarities else 0
 
             logger.info(f"✅ 검색 완료 | ef_search={ef_search} | "
@@ -366,7 +508,7 @@ class SupabaseService:
             return results
 
         except Exception as e:
-            elapsed = (time.time() - start_time) * 1000
+            elapsed = (time.perf_counter() - start_time) * 1000
             logger.error(f"❌ 검색 실패 | ef={ef_search} | 시간={elapsed:.2f}ms | 오류={str(e)}")
             import traceback
             traceback.print_exc()
@@ -374,6 +516,38 @@ class SupabaseService:
 
     # ==================== messages ====================
 
+    async def get_user_messages(self, user_id: str, limit: int = 15) -> List[Dict[str, Any]]:
+        """
+        사용자 최근 메시지 조회 (최신순, History 로드용)
+
+        ※ Postgres 풀 사용 시 RLS 대신 user_id 조건으로 범위 제한
+
+        Args:
+            user_id: 사용자 ID
+            limit: 조회 개수
+
+        Returns:
+            [{"user_query": ..., "ai_response": ...}, ...]
+        """
+        pool = await get_pool()
+        if pool is not None:
+            rows = await pool.fetch(
+                "SELECT user_query, ai_response FROM messages "
+                "WHERE user_id = $1 ORDER BY created_at DESC LIMIT $2",
+                user_id, limit
+            )
+            return [self._record_to_dict(row) for row in rows]
+
+        response = await _run_sync(
+            self.client.table("messages")
+            .select("user_query,ai_response")
+            .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .limit(limit)
+            .execute
+        )
+        return response.data or []
+
     def save_message(self, user_id: str, user_query: str, ai_response: str,
                      source_chunk_ids: Optional[List[str]] = None,
                      usage: Optional[Dict] = None) -> Dict[str, Any]:
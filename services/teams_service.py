@@ -4,6 +4,8 @@ from botbuilder.schema import Activity, ActivityTypes
 from botframework.connector import ConnectorClient
 from botframework.connector.auth import MicrosoftAppCredentials
 import os
+import time
+import asyncio
 import logging
 import httpx
 from typing import Optional
@@ -14,6 +16,9 @@ logger = logging.getLogger(__name__)
 class TeamsService:
     """Microsoft Teams 봇 서비스 (스트리밍 지원)"""
 
+    # AAD 토큰 캐시 시간 (토큰 수명 60분 - 여유 10분)
+    TOKEN_TTL_SECONDS = 3000
+
     def __init__(self):
         self.app_id = os.getenv("MICROSOFT_APP_ID")
         self.app_password = os.getenv("MICROSOFT_APP_PASSWORD")
@@ -22,8 +27,52 @@ class TeamsService:
         if not self.app_id or not self.app_password:
             raise ValueError("MICROSOFT_APP_ID and MICROSOFT_APP_PASSWORD must be set")
 
+        # ✅ 자격증명 1회 생성 (내부 토큰 캐시 유지)
+        self._credentials = MicrosoftAppCredentials(
+            self.app_id,
+            self.app_password,
+            self.tenant_id
+        )
+        self._token: Optional[str] = None
+        self._token_exp = 0.0
+        self._token_lock = asyncio.Lock()
+
+        # ✅ 스트리밍 프레임 전송용 공유 HTTP 클라이언트 (keep-alive + HTTP/2)
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=50,
+                keepalive_expiry=60
+            ),
+            timeout=10.0
+        )
+
         logger.info(f"✅ TeamsService initialized with App ID: {self.app_id[:8]}...")
 
+    async def _get_token(self) -> str:
+        """
+        Bearer 토큰 반환 (TTL 캐시)
+
+        - 토큰 유효시간 60분 → 50분간 재사용
+        - AAD 호출은 동기 I/O이므로 스레드에서 실행
+        """
+        if self._token and time.monotonic() < self._token_exp:
+            return self._token
+
+        async with self._token_lock:
+            now = time.monotonic()
+            if self._token and now < self._token_exp:
+                return self._token
+
+            self._token = await asyncio.to_thread(self._credentials.get_access_token)
+            self._token_exp = now + self.TOKEN_TTL_SECONDS
+            return self._token
+
+    async def aclose(self) -> None:
+        """공유 HTTP 클라이언트 종료 (앱 종료 시)"""
+        await self._http.aclose()
+
     # ============ 【기존 메서드】 ============
 
     async def send_reply(self, activity: Activity, message: str) -> bool:
@@ -32,14 +81,8 @@ class TeamsService:
             logger.info(f"🔍 Service URL: {activity.service_url}")
             logger.info(f"🔍 Conversation ID: {activity.conversation.id}")
 
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
-            )
-
             connector = ConnectorClient(
-                credentials,
+                self._credentials,
                 base_url=activity.service_url
             )
 
@@ -66,14 +109,8 @@ class TeamsService:
     async def send_typing_indicator(self, activity: Activity) -> bool:
         """타이핑 인디케이터 전송 (기존)"""
         try:
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
-            )
-
             connector = ConnectorClient(
-                credentials,
+                self._credentials,
                 base_url=activity.service_url
             )
 
@@ -132,26 +169,19 @@ class TeamsService:
                 }]
             }
 
-            # Bearer token 생성
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
+            # Bearer token (캐시 재사용)
+            token = await self._get_token()
+
+            # ✅ 공유 클라이언트 재사용 (TLS/DNS 비용은 첫 요청에서만)
+            response = await self._http.post(
+                f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                }
             )
 
-            token = credentials.get_access_token()
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
-                    json=payload,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
-
             if response.status_code == 201:
                 stream_id = response.json().get("id")
                 logger.info(f"✅ 스트리밍 시작: streamId={stream_id}")
@@ -198,24 +228,17 @@ class TeamsService:
                 }]
             }
 
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
-            )
-
-            token = credentials.get_access_token()
+            token = await self._get_token()
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
-                    json=payload,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
+            # ✅ 공유 클라이언트 재사용 (TLS/DNS 비용은 첫 요청에서만)
+            response = await self._http.post(
+                f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                }
+            )
 
             if response.status_code == 202:
                 logger.info(f"✅ Informative 업데이트: seq={sequence}")
@@ -262,24 +285,17 @@ class TeamsService:
                 }]
             }
 
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
-            )
-
-            token = credentials.get_access_token()
+            token = await self._get_token()
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
-                    json=payload,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
+            # ✅ 공유 클라이언트 재사용 (TLS/DNS 비용은 첫 요청에서만)
+            response = await self._http.post(
+                f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                }
+            )
 
             if response.status_code == 202:
                 logger.info(f"✅ Response Streaming: seq={sequence}, len={len(message)}")
@@ -324,24 +340,17 @@ class TeamsService:
                 }]
             }
 
-            credentials = MicrosoftAppCredentials(
-                self.app_id,
-                self.app_password,
-                self.tenant_id
-            )
-
-            token = credentials.get_access_token()
+            token = await self._get_token()
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
-                    json=payload,
-                    headers={
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    },
-                    timeout=10.0
-                )
+            # ✅ 공유 클라이언트 재사용 (TLS/DNS 비용은 첫 요청에서만)
+            response = await self._http.post(
+                f"{service_url}/v3/conversations/{conversation_id}/activities",  # ✅ 슬래시 추가!
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/json"
+                }
+            )
 
             if response.status_code == 202:
                 logger.info(f"✅ 최종 응답 완료: len={len(message)}")
@@ -355,5 +364,89 @@ class TeamsService:
             return False
 
 
+class TeamsStreamBuffer:
+    """
+    Teams 스트리밍 토큰 버퍼 (주기적 일괄 전송)
+
+    - append()는 누적만 하고 즉시 반환 (토큰 수신이 HTTP 전송에 막히지 않음)
+    - 백그라운드 태스크가 min_interval마다 변경분이 있을 때만 전송
+    - Teams 스트리밍 업데이트는 초당 1회로 제한되므로 토큰 단위 전송은 낭비
+    """
+
+    def __init__(
+            self,
+            service: "TeamsService",
+            conversation_id: str,
+            service_url: str,
+            stream_id: str,
+            start_sequence: int,
+            min_interval: float = 1.5
+    ):
+        self.service = service
+        self.conversation_id = conversation_id
+        self.service_url = service_url
+        self.stream_id = stream_id
+        self.sequence = start_sequence
+        self.min_interval = min_interval
+
+        self.text = ""
+        self._dirty = False
+        self._closed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """주기적 전송 태스크 시작"""
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def append(self, token: str) -> None:
+        """토큰 누적 (전송은 백그라운드)"""
+        if token:
+            self.text += token
+            self._dirty = True
+
+    async def _flush(self) -> None:
+        """누적 텍스트 전송 (변경 없으면 생략)"""
+        if not self._dirty:
+            return
+
+        self._dirty = False
+        logger.info(f"📤 Response 업데이트: {len(self.text)} 글자")
+        await self.service.stream_message_response(
+            conversation_id=self.conversation_id,
+            service_url=self.service_url,
+            stream_id=self.stream_id,
+            message=self.text,  # 누적된 전체 응답
+            sequence=self.sequence
+        )
+        self.sequence += 1
+
+    async def _flush_loop(self) -> None:
+        """min_interval마다 전송, finalize() 호출 시 즉시 종료"""
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), timeout=self.min_interval)
+            except asyncio.TimeoutError:
+                await self._flush()
+
+    async def finalize(self) -> str:
+        """
+        전송 태스크 종료 + 최종 메시지 전송
+
+        Returns:
+            전체 응답 텍스트
+        """
+        self._closed.set()
+        if self._task is not None:
+            await self._task
+
+        await self.service.stream_message_final(
+            conversation_id=self.conversation_id,
+            service_url=self.service_url,
+            stream_id=self.stream_id,
+            message=self.text
+        )
+        return self.text
+
+
 # 싱글톤
 teams_service = TeamsService()
@@ -1,7 +1,12 @@
 # services/token_chunk_service.py
 from transformers import AutoTokenizer
-from typing import List
+from collections import OrderedDict
+from typing import List, Tuple
+import hashlib
 import logging
+import threading
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -10,15 +15,50 @@ class TokenChunkService:
     dragonkue/BGE-m3-ko 토크나이저 기반 토큰 청킹 서비스
     """
 
+    # 토큰화 결과 LRU 캐시 크기 (문서 단위 텍스트라 항목당 크기가 큼 → 작게 유지)
+    # 재사용은 같은 페이지의 get_text_stats → chunk_text 연속 호출뿐 → 동시 처리분만 보관
+    ENCODE_CACHE_SIZE = 4
+
     def __init__(self, model_name: str = "dragonkue/BGE-m3-ko"):
         """
         초기화: 토크나이저 로드 (한 번만)
         """
         logger.info(f"🔧 TokenChunkService 초기화 중: {model_name}")
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
         self.model_name = model_name
+
+        if not self.tokenizer.is_fast:
+            logger.warning("⚠️ Fast 토크나이저 미지원 - batch_decode가 Python 구현으로 동작합니다")
+
+        # ✅ 토큰화 캐시 (get_text_stats → chunk_text 연속 호출 시 재토큰화 방지)
+        self._encode_cache: "OrderedDict[bytes, Tuple[int, ...]]" = OrderedDict()
+        self._encode_lock = threading.Lock()
+
         logger.info("✅ TokenChunkService 초기화 완료")
 
+    def _encode(self, text: str) -> Tuple[int, ...]:
+        """토큰화 (특수 토큰 제외, 내용 해시 기준 LRU 캐시)"""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+        with self._encode_lock:
+            cached = self._encode_cache.get(key)
+            if cached is not None:
+                self._encode_cache.move_to_end(key)
+                return cached
+
+        tokens = tuple(self.tokenizer.encode(
+            text,
+            add_special_tokens=False,
+            truncation=False
+        ))
+
+        with self._encode_lock:
+            self._encode_cache[key] = tokens
+            if len(self._encode_cache) > self.ENCODE_CACHE_SIZE:
+                self._encode_cache.popitem(last=False)
+
+        return tokens
+
     def chunk_text(
             self,
             text: str,
@@ -43,50 +83,49 @@ class TokenChunkService:
 
         logger.debug(f"📄 청킹 시작: {len(text)}자, target={chunk_tokens}tokens")
 
-        # 1. 토큰화 (특수 토큰 제외)
-        tokens = self.tokenizer.encode(
-            text,
-            add_special_tokens=False,
-            truncation=False
-        )
+        # 1. 토큰화 (특수 토큰 제외, 캐시 재사용)
+        tokens = self._encode(text)
 
         logger.debug(f"🔢 토큰화 완료: {len(tokens)} tokens")
 
-        # 2. 청크 생성
-        chunks = []
-        start = 0
+        if not tokens:
+            return []
+
+        # 2. 청크 범위 계산 (오버랩 적용, 최소 토큰 수 미만 제외)
+        step = chunk_tokens - overlap_tokens
+        if step <= 0:
+            raise ValueError("overlap_tokens must be smaller than chunk_tokens")
 
-        while start < len(tokens):
-            # 청크 토큰 범위
-            end = min(start + chunk_tokens, len(tokens))
-            chunk_token_ids = tokens[start:end]
+        n_tokens = len(tokens)
+        starts = np.arange(0, n_tokens, step, dtype=np.int64)
+        ends = np.minimum(starts + chunk_tokens, n_tokens)
 
-            # 토큰 → 텍스트 디코딩
-            chunk_text = self.tokenizer.decode(
-                chunk_token_ids,
-                skip_special_tokens=True,
-                clean_up_tokenization_spaces=True
-            )
+        # 마지막 청크 처리: 끝에 처음 도달한 윈도우까지만 사용
+        last = int(np.argmax(ends >= n_tokens))
+        starts, ends = starts[:last + 1], ends[:last + 1]
 
-            # 최소 토큰 수 체크
-            chunk_token_len = len(chunk_token_ids)
-            if chunk_token_len >= min_chunk_tokens and chunk_text.strip():
-                chunks.append(chunk_text.strip())
-                logger.debug(f"✅ 청크 생성: {chunk_token_len}tokens")
+        mask = (ends - starts) >= min_chunk_tokens
+        starts, ends = starts[mask].tolist(), ends[mask].tolist()
 
-            # 다음 시작점 (오버랩 적용)
-            start = end - overlap_tokens
+        if not starts:
+            logger.info("✅ 청킹 완료: 0개 청크 생성")
+            return []
+
+        # 3. 토큰 → 텍스트 일괄 디코딩 (Rust 토크나이저 1회 호출)
+        decoded = self.tokenizer.batch_decode(
+            [list(tokens[start:end]) for start, end in zip(starts, ends)],
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=True
+        )
 
-            # 마지막 청크 처리
-            if end >= len(tokens):
-                break
+        chunks = [chunk.strip() for chunk in decoded if chunk.strip()]
 
         logger.info(f"✅ 청킹 완료: {len(chunks)}개 청크 생성")
         return chunks
 
     def get_text_stats(self, text: str) -> dict:
         """텍스트 통계 (디버깅용)"""
-        tokens = self.tokenizer.encode(text, add_special_tokens=False)
+        tokens = self._encode(text)
         return {
             'char_count': len(text),
             'token_count': len(tokens),
@@ -11,23 +11,237 @@
 책임: 각 service를 조율하는 오케스트레이터 역할
 """
 
-from typing import AsyncGenerator, Dict, Optional, List
+from typing import Any, AsyncGenerator, Dict, Optional, List, Tuple
 from services.langchain_rag_service import langchain_rag_service
 from services.supabase_service import SupabaseService
 from services.comparison_service import comparison_service
 from services.history_service import history_service
+from services.embedding_service import embedding_service
+from services.semantic_cache import CachedResponse, semantic_cache
 from auth.user_service import user_service
+from config import SEMANTIC_CACHE_CONFIG
 from logging_config import get_logger
 import asyncio
-import json
 import time
 
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+    import json
+
 logger = get_logger(__name__)
 
+# sse_frame 출력 접두어 (모든 프레임은 "type" 키로 시작 → 일반 텍스트 토큰과 구분)
+SSE_FRAME_PREFIX = 'data: {"type":'
+
+
+def is_sse_frame(token: str) -> bool:
+    """process_chat이 yield한 값이 이미 완성된 SSE 프레임(done/error)인지 확인"""
+    return token.startswith(SSE_FRAME_PREFIX) and token.endswith("\n\n")
+
+
+def sse_frame(obj: Dict[str, Any]) -> str:
+    """SSE JSON 프레임 생성 (orjson 우선, 미설치 시 표준 json)
+
+    ※ "data: " 필드명 필수 (없으면 EventSource 등 표준 SSE 파서가 줄 전체를 무시)
+    """
+    if orjson is not None:
+        return "data: " + orjson.dumps(obj).decode() + "\n\n"
+    return "data: " + json.dumps(obj, ensure_ascii=False) + "\n\n"
+
 
 class UnifiedChatService:
     """Web + Teams 공용 채팅 서비스 (테이블 모드 + 비교 모드 조합 가능)"""
 
+    # 스트리밍 묶음 전송 기준 (체감 지연 없이 yield 횟수 감소)
+    STREAM_FLUSH_CHARS = 64
+    STREAM_FLUSH_INTERVAL = 0.05  # 초
+
+    # RAG 처리 제한 시간
+    RAG_TIMEOUT_SECONDS = 120.0
+    TIMEOUT_MESSAGE = "요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요."
+
+    # 이전 대화에 의존하는 후속 질문 표현 (포함 시 시맨틱 캐시 미사용)
+    FOLLOW_UP_KEYWORDS = (
+        "더 자세히", "자세히 설명", "좀 더", "다시 설명", "이어서", "계속",
+        "방금", "아까", "위에서", "앞에서", "위 내용", "그거", "그것", "그건", "이거", "이것",
+        "저거", "그럼", "그러면", "예시", "요약해",
+    )
+
+    # ==================== 공통 단계 ====================
+
+    async def _prepare(
+            self,
+            user_id: str,
+            query: str,
+            client_type: str,
+            supabase_client: Optional[SupabaseService],
+            email: Optional[str],
+            name: Optional[str],
+            conversation_context: Optional[List[Dict]]
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Step 1~3: 사용자 확인 + History 로드 (동시) → 비교 모드 감지
+
+        반환: (user_fk, history_text, comparison_info)
+        """
+        # 📋 Step 1 + 📚 Step 2: 사용자 정보 확인/생성 + History 로드 (동시 실행)
+        logger.info(f"👤 사용자 확인 + 📥 History 로드 시작: {user_id}", extra={
+            "client_type": client_type,
+            "email": email
+        })
+
+        # ✅ 서로 다른 테이블 조회 → 순차 대기 대신 병렬 (Supabase 왕복 1회분 절약)
+        user_fk, history_text = await asyncio.gather(
+            user_service.get_or_create_user(
+                user_id=user_id,
+                email=email,
+                name=name,
+                auth_type=client_type
+            ),
+            history_service.load_conversation_history(
+                user_id=user_id,
+                supabase_client=supabase_client
+            )
+        )
+
+        if history_text:
+            logger.info(f"✅ History 로드 완료: {len(history_text)} 글자")
+        else:
+            logger.info("ℹ️ History 없음 (첫 대화)")
+
+        # 🔍 Step 3: 비교 모드 감지 (향상된 버전)
+        logger.info("🔍 비교 모드 감지 시작")
+
+        comparison_info = comparison_service.detect_comparison_mode(
+            query=query,
+            history=history_text,
+            conversation_context=conversation_context  # ✅ 구조화된 history 전달
+        )
+
+        if comparison_info.get("is_comparison"):
+            logger.info(f"✅ 비교 모드 감지", extra={
+                "topics": comparison_info.get("topics"),
+                "confidence": comparison_info.get("confidence"),
+                "method": comparison_info.get("detection_method")
+            })
+        else:
+            logger.info("ℹ️ 일반 모드")
+
+        return user_fk, history_text, comparison_info
+
+    def _lookup_semantic_cache(
+            self,
+            user_id: str,
+            query: str,
+            table_mode: bool,
+            comparison_info: Dict[str, Any],
+            history_text: str
+    ) -> Tuple[Optional[List[float]], Optional[tuple], Optional[CachedResponse]]:
+        """
+        ⚡ 시맨틱 캐시 조회 (거의 동일한 질문 → 검색 + LLM 생략)
+
+        반환: (query_embedding, cache_namespace, cached)
+        - 비활성화/실패/캐시 대상 아님 → (None, None, None)
+        - History에 의존하지 않는 독립 질문만 대상 (_is_cacheable)
+          → 네임스페이스는 (user_id, table_mode)만 사용, 같은 사용자의 반복 질문이 적중
+        """
+        if not SEMANTIC_CACHE_CONFIG['enabled']:
+            return None, None, None
+
+        if not self._is_cacheable(query, history_text, comparison_info):
+            logger.debug("ℹ️ 후속/비교 질문 → 시맨틱 캐시 생략")
+            return None, None, None
+
+        try:
+            query_embedding = embedding_service.embed_text(query)
+            cache_namespace = (user_id, table_mode)
+            cached = semantic_cache.lookup(cache_namespace, query_embedding)
+        except Exception as e:
+            logger.warning(f"⚠️ 시맨틱 캐시 조회 실패 (무시): {e}")
+            return None, None, None
+
+        if cached is not None:
+            logger.info("⚡ 시맨틱 캐시 적중 (RAG 생략)", extra={
+                "length": len(cached.response)
+            })
+
+        return query_embedding, cache_namespace, cached
+
+    @classmethod
+    def _is_cacheable(cls, query: str, history_text: str, comparison_info: Dict[str, Any]) -> bool:
+        """
+        시맨틱 캐시 대상 여부 (답변이 이전 대화에 의존하지 않는 질문만)
+
+        - 비교 모드: History에서 토픽 추출 가능 → 제외
+        - History가 있으면서 후속 질문 표현 포함 ("더 자세히 설명해줘" 등) → 제외
+        ※ History는 매 요청 달라지므로 키에 넣으면 적중 불가 → 대상 판정에만 사용
+        """
+        if comparison_info.get("is_comparison"):
+            return False
+        if not history_text:
+            return True
+        return not any(keyword in query for keyword in cls.FOLLOW_UP_KEYWORDS)
+
+    @staticmethod
+    def _store_semantic_cache(
+            cache_namespace: Optional[tuple],
+            query_embedding: Optional[List[float]],
+            full_response: str,
+            source_chunk_ids: List[str]
+    ) -> None:
+        """⚡ 정상 응답만 캐시 저장 (오류 응답 제외)"""
+        if cache_namespace is not None and full_response and "\n\n[오류]\n" not in full_response:
+            semantic_cache.insert(
+                cache_namespace, query_embedding, full_response, source_chunk_ids
+            )
+
+    @staticmethod
+    def _schedule_save(
+            user_id: str,
+            user_fk: str,
+            query: str,
+            full_response: str,
+            table_mode: bool,
+            comparison_info: Dict[str, Any],
+            source_chunk_ids: List[str],
+            supabase_client: Optional[SupabaseService]
+    ) -> None:
+        """💾 Step 5: 메시지 저장 (백그라운드, 응답 완료 지연 없음)"""
+        logger.info("💾 메시지 저장 예약", extra={
+            "table_mode": table_mode,
+            "is_comparison": comparison_info.get("is_comparison")
+        })
+
+        history_service.save_message_background(
+            user_id=user_id,
+            user_fk=user_fk,
+            query=query,
+            response=full_response,
+            table_mode=table_mode,
+            comparison_mode=comparison_info.get("is_comparison"),
+            source_chunk_ids=source_chunk_ids,
+            supabase_client=supabase_client
+        )
+
+    def _collect_rag_response(self, deadline: float, **rag_kwargs) -> Tuple[str, bool]:
+        """
+        RAG 스트리밍 결과를 한 번에 수집 (비스트리밍 경로, 워커 스레드에서 실행)
+
+        반환: (전체 응답, 타임아웃 여부)
+        """
+        parts = []
+        for token in langchain_rag_service.process_query_streaming(**rag_kwargs):
+            if time.monotonic() > deadline:
+                return "".join(parts), True
+            if token:
+                parts.append(token)
+        return "".join(parts), False
+
+    # ==================== 스트리밍 ====================
+
+
     async def process_chat(
             self,
             user_id: str,
@@ -43,11 +257,11 @@ class UnifiedChatService:
         통합 채팅 처리 (Web + Teams 모두 사용, 테이블 모드 + 비교 모드 조합 가능)
 
         흐름:
-        1. 사용자 정보 확인/생성
+        1. 사용자 정보 확인/생성 (2와 동시 실행)
         2. History 로드 (DB에서 최근 대화)
         3. 비교 모드 감지 (향상된 자동 감지)
-        4. RAG 처리 (하이브리드 검색 + LLM)
-        5. 메시지 저장 (DB)
+        4. RAG 처리 (하이브리드 검색 + LLM, 유사 질문은 시맨틱 캐시 응답 재사용)
+        5. 메시지 저장 (DB, 백그라운드)
 
         인자:
         - user_id: 사용자 ID
@@ -60,7 +274,7 @@ class UnifiedChatService:
         - conversation_context: 구조화된 대화 히스토리 (List[Dict])
 
         생성(yield):
-        스트리밍 토큰 (각 문자)
+        스트리밍 텍스트 조각 (64자 또는 50ms 단위로 묶음)
 
         예시:
         async for token in unified_chat_service.process_chat(
@@ -72,50 +286,16 @@ class UnifiedChatService:
         ...     print(token, end="", flush=True)
         """
 
-        # 📋 Step 1: 사용자 정보 확인/생성
-        logger.info(f"👤 사용자 확인: {user_id}", extra={
-            "client_type": client_type,
-            "email": email
-        })
-
-        user_fk = await user_service.get_or_create_user(
+        user_fk, history_text, comparison_info = await self._prepare(
             user_id=user_id,
+            query=query,
+            client_type=client_type,
+            supabase_client=supabase_client,
             email=email,
             name=name,
-            auth_type=client_type
-        )
-
-        # 📚 Step 2: History 로드
-        logger.info("📥 History 로드 시작")
-
-        history_text = await history_service.load_conversation_history(
-            user_id=user_id,
-            supabase_client=supabase_client
-        )
-
-        if history_text:
-            logger.info(f"✅ History 로드 완료: {len(history_text)} 글자")
-        else:
-            logger.info("ℹ️ History 없음 (첫 대화)")
-
-        # 🔍 Step 3: 비교 모드 감지 (향상된 버전)
-        logger.info("🔍 비교 모드 감지 시작")
-
-        comparison_info = comparison_service.detect_comparison_mode(
-            query=query,
-            history=history_text,
-            conversation_context=conversation_context  # ✅ 구조화된 history 전달
+            conversation_context=conversation_context
         )
 
-        if comparison_info.get("is_comparison"):
-            logger.info(f"✅ 비교 모드 감지", extra={
-                "topics": comparison_info.get("topics"),
-                "confidence": comparison_info.get("confidence"),
-                "method": comparison_info.get("detection_method")
-            })
-        else:
-            logger.info("ℹ️ 일반 모드")
-
         # 🎯 Step 4: RAG 처리 (스트리밍)
         logger.info("🔎 RAG 처리 시작", extra={
             "table_mode": table_mode,
@@ -126,86 +306,202 @@ class UnifiedChatService:
         full_response = ""
         source_chunk_ids = []
 
-        try:
-            start_time = time.time()
+        query_embedding, cache_namespace, cached = self._lookup_semantic_cache(
+            user_id, query, table_mode, comparison_info, history_text
+        )
 
-            logger.info("🔎 검색 시작", extra={
-                "search_mode": "comparison" if comparison_info.get("is_comparison") else "normal",
-                "table_mode": table_mode
-            })
+        if cached is not None:
+            full_response = cached.response
+            source_chunk_ids = list(cached.source_chunk_ids)
 
-            for token in langchain_rag_service.process_query_streaming(
-                    user_id=user_id,
-                    query=query,
-                    table_mode=table_mode,  # ✅ 독립적으로 전달
-                    supabase_client=supabase_client,
-                    history=history_text,
-                    comparison_info=comparison_info,
-                    conversation_context=conversation_context  # ✅ 추가
-            ):
-                # ⏱️ 수동 타임아웃 체크 (120초)
-                elapsed = time.time() - start_time
-                if elapsed > 120.0:
-                    logger.error(f"⏱️ RAG 타임아웃 ({elapsed:.1f}초 경과)")
-                    error_msg = "요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요."
-                    yield f" {json.dumps({'type': 'error', 'error': error_msg}, ensure_ascii=False)}\n\n"
-                    return
-
-                # 🔥 토큰 처리 및 스트리밍
-                if token:
-                    full_response += token
-                    yield token
-
-                # 이벤트 루프에 양보 (응답성 향상)
+            for i in range(0, len(full_response), self.STREAM_FLUSH_CHARS):
+                yield full_response[i:i + self.STREAM_FLUSH_CHARS]
                 await asyncio.sleep(0)
 
-            logger.info(f"✅ RAG 완료", extra={
-                "length": len(full_response),
-                "elapsed": f"{time.time() - start_time:.1f}초"
-            })
-
-        except asyncio.TimeoutError:
-            logger.error("⏱️ RAG 타임아웃 (120초)")
-            error_msg = "요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요."
-            yield f" {json.dumps({'type': 'error', 'error': error_msg}, ensure_ascii=False)}\n\n"
-            return
-
-        except Exception as e:
-            logger.error(f"❌ RAG 처리 오류: {e}", exc_info=True)
-            error_msg = f"검색 처리 중 오류가 발생했습니다: {str(e)[:100]}"
-            yield f" {json.dumps({'type': 'error', 'error': error_msg}, ensure_ascii=False)}\n\n"
-            return
+        else:
+            try:
+                start_time = time.monotonic()
+                deadline = start_time + self.RAG_TIMEOUT_SECONDS
+
+                logger.info("🔎 검색 시작", extra={
+                    "search_mode": "comparison" if comparison_info.get("is_comparison") else "normal",
+                    "table_mode": table_mode
+                })
+
+                # 🔥 토큰 묶음 전송 버퍼 (토큰마다 yield/SSE 프레임 생성 방지)
+                pending = ""
+                last_flush = start_time
+
+                for token in langchain_rag_service.process_query_streaming(
+                        user_id=user_id,
+                        query=query,
+                        table_mode=table_mode,  # ✅ 독립적으로 전달
+                        supabase_client=supabase_client,
+                        history=history_text,
+                        comparison_info=comparison_info,
+                        conversation_context=conversation_context,  # ✅ 추가
+                        query_embedding=query_embedding  # ✅ 캐시 조회용 임베딩 재사용
+                ):
+                    # ⏱️ 시각 조회는 토큰당 1회 (타임아웃 + 묶음 전송 판단 공용)
+                    now = time.monotonic()
+
+                    # ⏱️ 수동 타임아웃 체크 (120초)
+                    if now > deadline:
+                        logger.error(f"⏱️ RAG 타임아웃 ({now - start_time:.1f}초 경과)")
+                        if pending:
+                            yield pending
+                        error_msg = self.TIMEOUT_MESSAGE
+                        yield sse_frame({'type': 'error', 'error': error_msg})
+                        return
+
+                    if token:
+                        full_response += token
+                        pending += token
+
+                    # 🔥 일정 길이 또는 일정 시간 경과 시 묶어서 전송
+                    if pending and (
+                            len(pending) >= self.STREAM_FLUSH_CHARS
+                            or now - last_flush >= self.STREAM_FLUSH_INTERVAL
+                    ):
+                        yield pending
+                        pending = ""
+                        last_flush = now
+
+                        # 이벤트 루프에 양보 (전송 시점에만)
+                        await asyncio.sleep(0)
+
+                if pending:
+                    yield pending
+
+                logger.info(f"✅ RAG 완료", extra={
+                    "length": len(full_response),
+                    "elapsed": f"{time.monotonic() - start_time:.1f}초"
+                })
+
+                self._store_semantic_cache(
+                    cache_namespace, query_embedding, full_response, source_chunk_ids
+                )
+
+            except asyncio.TimeoutError:
+                logger.error("⏱️ RAG 타임아웃 (120초)")
+                error_msg = self.TIMEOUT_MESSAGE
+                yield sse_frame({'type': 'error', 'error': error_msg})
+                return
+
+            except Exception as e:
+                logger.error(f"❌ RAG 처리 오류: {e}", exc_info=True)
+                error_msg = f"검색 처리 중 오류가 발생했습니다: {str(e)[:100]}"
+                yield sse_frame({'type': 'error', 'error': error_msg})
+                return
+
+        self._schedule_save(
+            user_id, user_fk, query, full_response, table_mode,
+            comparison_info, source_chunk_ids, supabase_client
+        )
 
-        # 💾 Step 5: 메시지 저장
-        logger.info("💾 메시지 저장", extra={
+        # ✨ 스트리밍 완료
+        logger.info(f"✨ 채팅 처리 완료", extra={
+            "client_type": client_type,
+            "length": len(full_response),
             "table_mode": table_mode,
             "is_comparison": comparison_info.get("is_comparison")
         })
+        yield sse_frame({'type': 'done'})
 
-        save_success = await history_service.save_message(
+    # ==================== 비스트리밍 ====================
+
+    async def _run_rag(
+            self,
+            user_id: str,
+            query: str,
+            table_mode: bool,
+            client_type: str,
+            supabase_client: Optional[SupabaseService],
+            email: Optional[str],
+            name: Optional[str],
+            conversation_context: Optional[List[Dict]]
+    ) -> Dict[str, Any]:
+        """
+        Step 1~5 일괄 처리 (토큰 단위 yield/SSE 프레임 없이 전체 응답 반환)
+
+        반환:
+        {
+            "response": 전체 응답 텍스트 (오류 시 ""),
+            "source_chunk_ids": [...],
+            "comparison_info": detect_comparison_mode 결과,
+            "error": 오류 메시지 또는 None
+        }
+        """
+        user_fk, history_text, comparison_info = await self._prepare(
             user_id=user_id,
-            user_fk=user_fk,
             query=query,
-            response=full_response,
-            table_mode=table_mode,
-            comparison_mode=comparison_info.get("is_comparison"),
-            source_chunk_ids=source_chunk_ids,
-            supabase_client=supabase_client
+            client_type=client_type,
+            supabase_client=supabase_client,
+            email=email,
+            name=name,
+            conversation_context=conversation_context
         )
 
-        if save_success:
-            logger.info("✅ 메시지 저장 완료")
+        # 🎯 Step 4: RAG 처리 (캐시 적중 시 생략)
+        query_embedding, cache_namespace, cached = self._lookup_semantic_cache(
+            user_id, query, table_mode, comparison_info, history_text
+        )
+
+        result = {
+            "response": "",
+            "source_chunk_ids": [],
+            "comparison_info": comparison_info,
+            "error": None
+        }
+
+        if cached is not None:
+            result["response"] = cached.response
+            result["source_chunk_ids"] = list(cached.source_chunk_ids)
+
         else:
-            logger.warning("⚠️ 메시지 저장 실패 (비치명적)")
+            try:
+                start_time = time.monotonic()
 
-        # ✨ 스트리밍 완료
-        logger.info(f"✨ 채팅 처리 완료", extra={
-            "client_type": client_type,
-            "length": len(full_response),
-            "table_mode": table_mode,
-            "is_comparison": comparison_info.get("is_comparison")
-        })
-        yield f" {json.dumps({'type': 'done'}, ensure_ascii=False)}\n\n"
+                # 동기 제너레이터(검색 + LLM) → 워커 스레드 (이벤트 루프 블로킹 방지)
+                full_response, timed_out = await asyncio.to_thread(
+                    self._collect_rag_response,
+                    start_time + self.RAG_TIMEOUT_SECONDS,
+                    user_id=user_id,
+                    query=query,
+                    table_mode=table_mode,
+                    supabase_client=supabase_client,
+                    history=history_text,
+                    comparison_info=comparison_info,
+                    conversation_context=conversation_context,
+                    query_embedding=query_embedding
+                )
+
+                if timed_out:
+                    logger.error(f"⏱️ RAG 타임아웃 ({time.monotonic() - start_time:.1f}초 경과)")
+                    result["error"] = self.TIMEOUT_MESSAGE
+                    return result
+
+                logger.info(f"✅ RAG 완료", extra={
+                    "length": len(full_response),
+                    "elapsed": f"{time.monotonic() - start_time:.1f}초"
+                })
+
+                self._store_semantic_cache(
+                    cache_namespace, query_embedding, full_response, result["source_chunk_ids"]
+                )
+                result["response"] = full_response
+
+            except Exception as e:
+                logger.error(f"❌ RAG 처리 오류: {e}", exc_info=True)
+                result["error"] = f"검색 처리 중 오류가 발생했습니다: {str(e)[:100]}"
+                return result
+
+        self._schedule_save(
+            user_id, user_fk, query, result["response"], table_mode,
+            comparison_info, result["source_chunk_ids"], supabase_client
+        )
+
+        return result
 
     async def process_chat_non_streaming(
             self,
@@ -224,6 +520,7 @@ class UnifiedChatService:
         장점:
         - 전체 응답 한 번에 수신
         - Teams 적응형 카드 등 구성된 응답에 적합
+        - 스트리밍 묶음/SSE 프레임 생성 없이 _run_rag 결과 직접 사용
 
         반환:
         {
@@ -231,44 +528,35 @@ class UnifiedChatService:
             "source_chunk_ids": ["chunk1", "chunk2"],
             "is_comparison": True/False,
             "topics": ["A", "B"],
-            "table_mode": bool
+            "table_mode": bool,
+            "error": 오류 메시지 (타임아웃/RAG 실패 시) 또는 None
         }
+        ※ error가 있으면 response는 "" (빈 답변과 실패 구분은 error로 판단)
         """
 
-        full_response = ""
+        result = await self._run_rag(
+            user_id=user_id,
+            query=query,
+            table_mode=table_mode,
+            client_type=client_type,
+            supabase_client=supabase_client,
+            email=email,
+            name=name,
+            conversation_context=conversation_context
+        )
 
-        # 스트리밍 토큰 수집
-        async for token in self.process_chat(
-                user_id=user_id,
-                query=query,
-                table_mode=table_mode,
-                client_type=client_type,
-                supabase_client=supabase_client,
-                email=email,
-                name=name,
-                conversation_context=conversation_context  # ✅ 전달
-        ):
-            # 에러나 완료 메시지는 제외
-            if token.startswith(" "):
-                try:
-                    data = json.loads(token[1:].strip())
-                    if data.get("type") == "done":
-                        break
-                except:
-                    pass
-            else:
-                full_response += token
-
-        # 비교 모드 재감지 (이미 감지되었지만 반환용)
-        comparison_info = comparison_service.detect_comparison_mode(query, "")
+        # ✅ _prepare에서 감지한 결과 재사용 (재감지 없음)
+        comparison_info = result["comparison_info"]
 
         return {
-            "response": full_response,
+            "response": result["response"],
+            "source_chunk_ids": result["source_chunk_ids"],
             "is_comparison": comparison_info.get("is_comparison"),
             "topics": comparison_info.get("topics"),
             "user_id": user_id,
             "client_type": client_type,
-            "table_mode": table_mode  # ✅ 추가
+            "table_mode": table_mode,  # ✅ 추가
+            "error": result["error"]
         }
 
 